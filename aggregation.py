@@ -0,0 +1,46 @@
+import numpy as np
+
+# Packet sizes used to scale transmit energy. A plain reading carries one float32; an
+# aggregate carries mean/min/max as float32 plus a uint16 count.
+HEADER_BYTES = 13
+READING_BYTES = 4
+AGGREGATE_BYTES = 14
+AGGREGATE_SCALE = (HEADER_BYTES + AGGREGATE_BYTES) / (HEADER_BYTES + READING_BYTES)
+
+# Per-node inbox for the object engine: {data_type: [count, total, min, max]}
+def add_reading(inbox, data_type, value):
+    entry = inbox.get(data_type)
+    if entry is None:
+        inbox[data_type] = [1, value, value, value]
+    else:
+        entry[0] += 1
+        entry[1] += value
+        entry[2] = min(entry[2], value)
+        entry[3] = max(entry[3], value)
+
+def merge(inbox, other):
+    for data_type, (count, total, minimum, maximum) in other.items():
+        entry = inbox.get(data_type)
+        if entry is None:
+            inbox[data_type] = [count, total, minimum, maximum]
+        else:
+            entry[0] += count
+            entry[1] += total
+            entry[2] = min(entry[2], minimum)
+            entry[3] = max(entry[3], maximum)
+
+# Vectorized grouping for array protocols: one aggregate per (via, type code).
+# Returns (via, code, count, mean, min, max) arrays, one row per aggregated packet.
+def aggregate_groups(via, codes, values, num_types):
+    if len(via) == 0:
+        empty = np.empty(0)
+        return via[:0], codes[:0], np.empty(0, dtype=np.int64), empty, empty, empty
+    key = via.astype(np.int64) * num_types + codes
+    order = np.argsort(key, kind='stable')
+    key = key[order]
+    values = values[order]
+    starts = np.flatnonzero(np.concatenate(([True], key[1:] != key[:-1])))
+    count = np.diff(np.append(starts, len(key)))
+    mean = np.add.reduceat(values, starts) / count
+    return (key[starts] // num_types, (key[starts] % num_types).astype(codes.dtype), count, mean,
+            np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts))
@@ -0,0 +1,141 @@
+import io
+import json
+import mmap
+import pickle
+import struct
+import numpy as np
+
+MAGIC = b'WSNCKPT1'
+ALIGN = 64
+INLINE_BYTES = 4096  # Buffers smaller than this stay inside the pickle stream
+NUMERIC = {float: np.float64, int: np.int64, bool: np.bool_}
+
+def _slots(cls):
+    return [name for klass in reversed(cls.__mro__) for name in klass.__dict__.get('__slots__', ())]
+
+def pack_nodes(nodes):
+    # Slotted nodes as columns: per class, the positions of its nodes and one column per slot,
+    # a NumPy array when every value has the same numeric type, else a list
+    groups = {}
+    for i, node in enumerate(nodes):
+        groups.setdefault(type(node), []).append(i)
+    packed = []
+    for cls, members in groups.items():
+        columns = {}
+        for name in _slots(cls):
+            values = [getattr(nodes[i], name) for i in members]
+            kinds = set(map(type, values))
+            kind = kinds.pop() if len(kinds) == 1 else None
+            columns[name] = np.array(values, dtype=NUMERIC[kind]) if kind in NUMERIC else values
+        packed.append((cls, np.array(members, dtype=np.int64), columns))
+    return len(nodes), packed
+
+def unpack_nodes(state):
+    count, packed = state
+    nodes = [None] * count
+    for cls, members, columns in packed:
+        objects = [cls.__new__(cls) for _ in range(len(members))]
+        for name, values in columns.items():
+            values = values.tolist() if isinstance(values, np.ndarray) else values
+            list(map(getattr(cls, name).__set__, objects, values))  # Slot descriptors
+        for i, node in zip(members.tolist(), objects):
+            nodes[i] = node
+    return nodes
+
+# Pickles an engine with its node list stored as columns; other references to a node
+# (readings of the last cycle, say) become its index in that list. Persistent ids bypass
+# the pickle memo, so the list is packed once and every later holder (router, connectivity
+# tracker) refers back to it.
+class _Pickler(pickle.Pickler):
+    def __init__(self, stream, nodes, buffer_callback):
+        super().__init__(stream, protocol=5, buffer_callback=buffer_callback)
+        self.nodes = nodes
+        self.positions = {id(node): i for i, node in enumerate(nodes)}
+        self.packed = False
+
+    def persistent_id(self, obj):
+        if obj is self.nodes:
+            if self.packed:
+                return 'nodes', None
+            self.packed = True
+            return 'nodes', pack_nodes(obj)
+        i = self.positions.get(id(obj))
+        if i is not None and obj is self.nodes[i]:
+            return 'node', i
+        return None
+
+class _Unpickler(pickle.Unpickler):
+    nodes = None
+
+    def persistent_load(self, pid):
+        kind, value = pid
+        if kind == 'nodes':
+            # Engine.nodes is the engine's first attribute, so the list comes before any single node
+            if value is not None:
+                self.nodes = unpack_nodes(value)
+            return self.nodes
+        return self.nodes[value]
+
+# Snapshot file: MAGIC, header length (u64), JSON header, the pickled engine, then every
+# large buffer (node columns, NodeArray, collected-data store, environment tables) raw and
+# 64-byte aligned. The engine is pickled with protocol 5 and its array buffers are taken out of
+# band, so restoring maps them straight from the file (copy-on-write): nothing is read
+# until touched, and forks restored from one file share its pages.
+def save(engine, path):
+    buffers = []
+
+    def out_of_band(buffer):
+        if buffer.raw().nbytes < INLINE_BYTES:
+            return True  # In band
+        buffers.append(buffer)
+        return False
+
+    stream = io.BytesIO()
+    _Pickler(stream, engine.nodes, out_of_band).dump(engine)
+    payload = stream.getvalue()
+    layout = []
+    offset = 0
+    for buffer in buffers:
+        offset = -(-offset // ALIGN) * ALIGN
+        layout.append([offset, buffer.raw().nbytes])
+        offset += buffer.raw().nbytes
+    header = {'version': 1, 'cycle': engine.cycle, 'backend': engine.backend, 'nodes': len(engine.nodes),
+              'payload': len(payload), 'buffers': layout}
+    head = json.dumps(header).encode()
+    # Buffer offsets are relative to the aligned start of the data section
+    start = -(-(len(MAGIC) + 8 + len(head) + len(payload)) // ALIGN) * ALIGN
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(head)))
+        f.write(head)
+        f.write(payload)
+        for buffer, (at, size) in zip(buffers, layout):
+            f.seek(start + at)
+            f.write(buffer.raw())
+        f.truncate(start + offset)
+    return header
+
+def _header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{f.name} is not an engine checkpoint")
+    size, = struct.unpack('<Q', f.read(8))
+    return json.loads(f.read(size)), len(MAGIC) + 8 + size
+
+def read_header(path):
+    # Cycle, backend and node count of a checkpoint without loading it
+    with open(path, 'rb') as f:
+        return _header(f)[0]
+
+def load(path, mapped=True):
+    # Restore an Engine saved by save(). mapped=False reads the whole file into memory instead.
+    with open(path, 'rb') as f:
+        header, begin = _header(f)
+        f.seek(0)
+        if mapped:
+            data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+        else:
+            data = memoryview(bytearray(f.read()))
+    payload = data[begin:begin + header['payload']]
+    start = -(-(begin + header['payload']) // ALIGN) * ALIGN
+    buffers = [data[start + at:start + at + size] for at, size in header['buffers']]
+    return _Unpickler(io.BytesIO(payload), buffers=buffers).load()
@@ -0,0 +1,159 @@
+import math
+import numpy as np
+from aggregation import AGGREGATE_SCALE, aggregate_groups
+from nodearray import SENSE_LOW
+
+# Vectorized nearest-target lookup on a uniform grid. Targets are sorted by cell; every
+# point gathers the targets of the 3x3 block of cells around it as one flat candidate
+# list. A hit closer than one cell width is exact; the rest retry with doubled cells,
+# until the cells reach limit: callers that only care about targets within limit can
+# stop there, and points left further away keep an inexact (too large) distance.
+def nearest_in_grid(px, py, tx, ty, cell_size, limit=math.inf):
+    n = len(px)
+    best = np.full(n, -1, dtype=np.int64)
+    best_d2 = np.full(n, np.inf)
+    if len(tx) == 0 or n == 0:
+        return best, best_d2
+    x0 = min(px.min(), tx.min())
+    y0 = min(py.min(), ty.min())
+    # One cell of padding on each side so neighbor cells never fall off the grid
+    ncy = int((max(py.max(), ty.max()) - y0) // cell_size) + 3
+    ncx = int((max(px.max(), tx.max()) - x0) // cell_size) + 3
+    tcell = ((tx - x0) // cell_size + 1).astype(np.int64) * ncy + ((ty - y0) // cell_size + 1).astype(np.int64)
+    order = np.argsort(tcell, kind='stable')
+    counts = np.bincount(tcell, minlength=ncx * ncy)
+    starts = np.cumsum(counts) - counts
+    sx = tx[order]
+    sy = ty[order]
+
+    pcell = ((px - x0) // cell_size + 1).astype(np.int64) * ncy + ((py - y0) // cell_size + 1).astype(np.int64)
+    offsets = np.array([dx * ncy + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+    cells = (pcell[:, None] + offsets).ravel()
+    per_cell = counts[cells]
+    owner = np.repeat(np.arange(len(cells)) // 9, per_cell)
+    pos = np.arange(len(owner)) - np.repeat(np.cumsum(per_cell) - per_cell - starts[cells], per_cell)
+    ddx = sx[pos] - px[owner]
+    ddy = sy[pos] - py[owner]
+    d2 = ddx * ddx + ddy * ddy
+
+    # Candidates are contiguous per point: segment-min, then the first candidate hitting it
+    per_point = per_cell.reshape(n, 9).sum(axis=1)
+    found = per_point > 0
+    if len(d2):
+        best_d2[found] = np.minimum.reduceat(d2, (np.cumsum(per_point) - per_point)[found])
+        hits = np.flatnonzero(d2 == best_d2[owner])
+        points, first = np.unique(owner[hits], return_index=True)
+        best[points] = order[pos[hits[first]]]
+
+    # Anything further than a cell width could have a closer target outside the 3x3 block
+    unsure = np.flatnonzero(best_d2 > cell_size * cell_size)
+    if len(unsure) and cell_size < limit:
+        best[unsure], best_d2[unsure] = nearest_in_grid(px[unsure], py[unsure], tx, ty, cell_size * 2, limit)
+    return best, best_d2
+
+# LEACH-style clustering over a NodeArray: probabilistic cluster-head rotation each
+# round, members join the nearest head, heads relay to their nearest sink.
+class LEACH:
+    def __init__(self, array, sinks, p=0.05, round_length=1, aggregate=False):
+        if not 0 < p <= 1:
+            raise ValueError("cluster-head probability p must be in (0, 1]")
+        self.array = array
+        self.sinks = sinks
+        self.p = p
+        self.round_length = round_length
+        self.aggregate = aggregate  # Heads send one mean/min/max/count packet per data type
+        self.epoch = int(round(1 / p))
+        self.round = -1
+        self.last_head = np.full(len(array), -self.epoch, dtype=np.int64)
+        self.heads = np.empty(0, dtype=np.int64)
+        self.head_of = np.full(len(array), -1, dtype=np.int64)  # Each node's head, -1 if none in range
+        self.head_distance = np.zeros(len(array))  # Meaningful for members only
+
+    def elect(self, rng, awake=None):
+        # T(n) = p / (1 - p * (r mod 1/p)) for nodes that haven't led in the current epoch.
+        # Only live nodes among awake (default: all) can lead: a duty-cycled node that is
+        # asleep this cycle can't take on a cluster.
+        self.round += 1
+        array = self.array
+        r = self.round
+        threshold = self.p / (1 - self.p * (r % self.epoch))
+        candidates = np.flatnonzero(array.active) if awake is None else awake[array.active[awake]]
+        eligible = candidates[r - self.last_head[candidates] >= self.epoch]
+        draws = array.draws(rng, eligible, r, 'elect')
+        self.heads = eligible[draws < threshold]
+        self.last_head[self.heads] = r
+        self.assign()
+
+    def assign(self, nodes=None):
+        # Join nodes (default: every live node) to their nearest head within comm_range
+        array = self.array
+        heads = self.heads
+        if nodes is None:
+            self.head_of.fill(-1)
+            nodes = np.flatnonzero(array.active)
+        else:
+            self.head_of[nodes] = -1
+        if len(heads) == 0 or len(nodes) == 0:
+            return
+        # Cells sized to hold about one head each; no need to look further than any node can send
+        area = (np.ptp(array.x[nodes]) + 1.0) * (np.ptp(array.y[nodes]) + 1.0)
+        cell = math.sqrt(area / len(heads))
+        nearest, d2 = nearest_in_grid(array.x[nodes], array.y[nodes], array.x[heads], array.y[heads], cell,
+                                      array.comm_range[nodes].max())
+        distance = np.sqrt(d2)
+        in_range = distance <= array.comm_range[nodes]
+        self.head_of[nodes[in_range]] = heads[nearest[in_range]]
+        self.head_distance[nodes] = distance
+        self.head_of[heads] = heads
+        self.head_distance[heads] = 0.0
+
+    def transmit(self, rng, sensed, cycle):
+        # Members pay the short hop to their head, heads pay the long haul to the sink for
+        # every packet they forward, whether or not they sensed this cycle themselves. A head
+        # out of its sink's range has nowhere to send, so its own and its members' readings
+        # are lost. Nodes without a head in range send straight to the sink. Heads are
+        # elected among the nodes that sensed on the round's first cycle.
+        # Returns (delivered, via, aggregates): plain readings with the node whose sink they
+        # reached, and the aggregate_groups() rows when aggregating (else None).
+        array = self.array
+        if (cycle - 1) % self.round_length == 0:
+            self.elect(rng, sensed)
+        elif not array.active[self.heads].all():
+            # A head died mid-round: only its live members rejoin the surviving heads
+            dead = self.heads[~array.active[self.heads]]
+            self.heads = self.heads[array.active[self.heads]]
+            orphans = np.flatnonzero(np.isin(self.head_of, dead))
+            self.head_of[dead] = -1
+            self.assign(orphans[array.active[orphans]])
+        head_of = self.head_of[sensed]
+        is_head = head_of == sensed
+        members = sensed[(head_of >= 0) & ~is_head]
+        loners = sensed[head_of < 0]
+
+        joined = array.transmit(members, self.head_distance[members])
+        sink_distance = array.distance_to(self.sinks)
+        direct = array.transmit(loners, sink_distance[loners])
+
+        heads = self.heads
+        relays = heads[array.active[heads] & (sink_distance[heads] <= array.comm_range[heads])]
+        relaying = np.zeros(len(array), dtype=bool)
+        relaying[relays] = True
+        joined = joined[relaying[self.head_of[joined]]]
+        own = sensed[is_head]
+        own = own[relaying[own]]
+        haul = array.energy_per_transmit[relays] * (sink_distance[relays] / array.comm_range[relays])
+        sources = np.concatenate((own, joined))
+        via = np.concatenate((own, self.head_of[joined]))
+        if self.aggregate:
+            groups = aggregate_groups(via, array.data_type[sources], array.value[sources], len(SENSE_LOW))
+            # A lone reading goes out as a plain packet, anything combined as an aggregate
+            scale = np.where(groups[2] > 1, AGGREGATE_SCALE, 1.0)
+            packets = np.bincount(groups[0], weights=scale, minlength=len(array))[relays]
+        else:
+            groups = None
+            packets = np.bincount(via, minlength=len(array))[relays]
+        array.battery[relays] -= haul * packets
+        array.active[relays] = array.battery[relays] > 0
+        if groups is not None:
+            return direct, direct, groups
+        return np.concatenate((sources, direct)), np.concatenate((via, direct)), None
@@ -0,0 +1,125 @@
+import numpy as np
+from radio import LoRaRadio
+
+def _levels(length):
+    # floor(log2(length)) for positive integer lengths
+    return np.frexp(length.astype(np.float64))[1] - 1
+
+def _range_max(values, lo, hi):
+    # max(values[lo:hi]) per query (hi > lo), from a sparse table of power-of-two blocks
+    level = _levels(hi - lo)
+    table = [values]
+    for p in range(1, int(level.max()) + 1 if len(level) else 1):
+        prev = table[-1]
+        half = 1 << (p - 1)
+        table.append(np.maximum(prev[:-half], prev[half:]))
+    out = np.empty(len(lo))
+    for p in np.unique(level).tolist():
+        rows = level == p
+        t = table[p]
+        out[rows] = np.maximum(t[lo[rows]], t[hi[rows] - (1 << p)])
+    return out
+
+def _spread_max(values, lo, hi, n):
+    # The reverse: out[k] = max(values[q] for every query q with lo[q] <= k < hi[q]), -inf
+    # where none. Each range is written to two power-of-two blocks, then pushed down a level
+    # at a time.
+    level = _levels(hi - lo)
+    top = int(level.max()) if len(level) else 0
+    table = [np.full(n, -np.inf) for _ in range(top + 1)]
+    for p in np.unique(level).tolist():
+        rows = level == p
+        np.maximum.at(table[p], lo[rows], values[rows])
+        np.maximum.at(table[p], hi[rows] - (1 << p), values[rows])
+    for p in range(top, 0, -1):
+        half = 1 << (p - 1)
+        below = table[p - 1]
+        np.maximum(below, table[p], out=below)
+        np.maximum(below[half:], table[p][:-half], out=below[half:])
+    return table[0]
+
+# Pure-ALOHA collision sweep. Packets interfere only within the same group (gateway,
+# channel and spreading factor); each group is shifted onto its own stretch of the time
+# axis so one global sort by start time handles them all. After sorting, the packets
+# overlapping i from later on are exactly i+1 .. searchsorted(start, end_i), and an earlier
+# one overlaps i iff the running maximum of end times passes start_i.
+# With capture_db set, a packet survives if its power beats every overlapping packet's
+# by at least capture_db. Returns a boolean lost mask in input order.
+def collisions(start, end, group, power=None, capture_db=None):
+    n = len(start)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    start = np.asarray(start, dtype=np.float64)
+    end = np.asarray(end, dtype=np.float64)
+    t0 = start.min()
+    span = end.max() - t0 + 1.0
+    _, rank = np.unique(group, return_inverse=True)
+    shifted = start - t0 + rank * span
+    order = np.argsort(shifted, kind='stable')
+    s = shifted[order]
+    e = (end - t0 + rank * span)[order]
+    later = np.searchsorted(s, e, side='left')  # One past the last packet starting before i ends
+    idx = np.arange(n)
+    if capture_db is None or power is None:
+        running = np.maximum.accumulate(e)
+        earlier = np.concatenate(([False], s[1:] < running[:-1]))
+        lost_sorted = (later > idx + 1) | earlier
+    else:
+        p = np.asarray(power, dtype=np.float64)[order]
+        interference = np.full(n, -np.inf)
+        hit = np.flatnonzero(later > idx + 1)
+        if len(hit):
+            # Strongest later packet overlapping i, and i's power spread over the later packets it overlaps
+            interference[hit] = _range_max(p, hit + 1, later[hit])
+            np.maximum(interference, _spread_max(p[hit], hit + 1, later[hit], n), out=interference)
+        lost_sorted = p - interference < capture_db
+    lost = np.empty(n, dtype=bool)
+    lost[order] = lost_sorted
+    return lost
+
+# Uplink channel for single-hop traffic. Every packet of a cycle starts at a random time in
+# a window of `window` seconds on a random channel, with airtime and spreading factor
+# from the radio's link budget; collisions() decides which ones the gateway decodes.
+# Engine talks to any channel through resolve(distance, sink, x, y) and charges the senders
+# of the packets left in on_air; see mac.py for CSMA.
+class AlohaChannel:
+    def __init__(self, radio=None, window=600.0, channels=3, capture_db=6.0, seed=None):
+        self.radio = radio if radio is not None else LoRaRadio()
+        self.window = window
+        self.channels = channels
+        self.capture_db = capture_db  # None: any overlap destroys both packets
+        self.rng = np.random.default_rng(seed)
+        self.sent = 0
+        self.lost = 0
+        self.on_air = None  # Mask of the last resolve()'s packets that were transmitted (and cost energy)
+
+    def delivery_ratio(self):
+        return (self.sent - self.lost) / self.sent if self.sent else 1.0
+
+    def packets(self, distance, payload_scale=1.0):
+        # (sf, airtime, out_of_range) per packet from the radio's link budget
+        radio = self.radio
+        sf = radio.spreading_factors(distance)
+        out_of_range = sf == 0
+        sf[out_of_range] = 12
+        return sf, radio.airtime_array[sf, radio.payload_bytes(payload_scale)], out_of_range
+
+    def decode(self, start, airtime, channel, sf, sink, distance):
+        # Lost mask for packets on air over [start, start + airtime)
+        radio = self.radio
+        group = (np.asarray(sink, dtype=np.int64) * self.channels + channel) * 16 + sf
+        power = radio.tx_power - radio.path_loss(distance)
+        return collisions(start, start + airtime, group, power, self.capture_db)
+
+    def resolve(self, distance, sink, x=None, y=None, payload_scale=1.0):
+        # Lost mask for one cycle's packets, given each sender's distance to its gateway
+        distance = np.asarray(distance, dtype=np.float64)
+        n = len(distance)
+        sf, airtime, out_of_range = self.packets(distance, payload_scale)
+        start = self.rng.random(n) * np.maximum(self.window - airtime, 0.0)
+        channel = self.rng.integers(self.channels, size=n)
+        lost = self.decode(start, airtime, channel, sf, sink, distance) | out_of_range
+        self.on_air = np.ones(n, dtype=bool)
+        self.sent += n
+        self.lost += int(lost.sum())
+        return lost
@@ -0,0 +1,156 @@
+from collections import deque
+from spatial import SpatialHash
+
+# Sink reachability for a delete-only network. Keeps a BFS spanning forest rooted at
+# the sinks; when a node dies only its orphaned subtree looks for a way back in.
+# Links are directed like transmissions: i can send to j when j is within i's comm_range.
+# Nodes that fail to reconnect are cut off for good, since deaths never add links.
+class ConnectivityTracker:
+    def __init__(self, nodes, sinks, index):
+        self.nodes = nodes
+        self.sinks = sinks
+        self.index = index  # SpatialHash of live nodes, keyed by node index
+        self.max_range = max((node.comm_range for node in nodes), default=0.0)
+        self.parent = [None] * len(nodes)
+        self.children = [set() for _ in range(len(nodes))]
+        self.reachable = 0
+        self.events = []  # (cycle, nodes cut off, reachable after) per partition event
+        self.build()
+
+    def _links_to(self, j, x, y):
+        node = self.nodes[j]
+        dx = node.x - x
+        dy = node.y - y
+        return dx * dx + dy * dy <= node.comm_range * node.comm_range
+
+    def _attach(self, i, hop):
+        old = self.parent[i]
+        if old is not None and old >= 0:
+            self.children[old].discard(i)
+        self.parent[i] = hop
+        if hop is not None and hop >= 0:
+            self.children[hop].add(i)
+
+    def build(self):
+        for i in range(len(self.nodes)):
+            self._attach(i, None)
+        queue = deque()
+        for s, sink in enumerate(self.sinks):
+            for i in self.index.neighbors(sink.x, sink.y, self.max_range):
+                if self.parent[i] is None and self._links_to(i, sink.x, sink.y):
+                    self._attach(i, -(s + 1))
+                    queue.append(i)
+        self.reachable = len(queue) + self._grow(queue, None)
+
+    def _grow(self, queue, allowed):
+        # Reverse BFS from attached nodes; returns how many nodes were newly attached
+        attached = 0
+        nodes = self.nodes
+        while queue:
+            i = queue.popleft()
+            x, y = nodes[i].x, nodes[i].y
+            for j in self.index.neighbors(x, y, self.max_range, exclude=i):
+                if self.parent[j] is not None or (allowed is not None and j not in allowed):
+                    continue
+                if self._links_to(j, x, y):
+                    self._attach(j, i)
+                    queue.append(j)
+                    attached += 1
+        return attached
+
+    def is_reachable(self, i):
+        return self.parent[i] is not None
+
+    def remove(self, i, cycle=None):
+        # Call after node i has left the spatial index. Returns the nodes newly cut off.
+        was_reachable = self.parent[i] is not None
+        orphans = []
+        stack = list(self.children[i])
+        while stack:
+            j = stack.pop()
+            orphans.append(j)
+            stack.extend(self.children[j])
+        self._attach(i, None)
+        if was_reachable:
+            self.reachable -= 1
+        if not orphans:
+            return []
+        orphan_set = set(orphans)
+        for j in orphans:
+            self.children[j].clear()
+            self.parent[j] = None
+        # Orphans with a live link to the rest of the tree (or straight to a sink) seed the repair
+        queue = deque()
+        nodes = self.nodes
+        for j in orphans:
+            node = nodes[j]
+            for s, sink in enumerate(self.sinks):
+                if self._links_to(j, sink.x, sink.y):
+                    self._attach(j, -(s + 1))
+                    break
+            else:
+                for k in self.index.neighbors(node.x, node.y, node.comm_range, exclude=j):
+                    if k not in orphan_set and self.parent[k] is not None:
+                        self._attach(j, k)
+                        break
+            if self.parent[j] is not None:
+                queue.append(j)
+        self._grow(queue, orphan_set)
+        cut = [j for j in orphans if self.parent[j] is None]
+        if cut:
+            self.reachable -= len(cut)
+            self.events.append((cycle, len(cut), self.reachable))
+        return cut
+
+# Offline variant: replay a finished run's death log backwards with union-find.
+# Returns how many live nodes can reach a sink after each death, in death order.
+# Links are taken as undirected (within the shorter of the two comm ranges), which
+# matches the online tracker whenever all nodes share one comm_range.
+def reachable_after_deaths(nodes, sinks, death_order):
+    root = len(nodes)  # Virtual node standing in for every sink
+    parent = list(range(len(nodes) + 1))
+    size = [1] * len(nodes) + [0]
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        a, b = find(a), find(b)
+        if a == b:
+            return
+        if b == root or (a != root and size[a] < size[b]):
+            a, b = b, a
+        parent[b] = a
+        size[a] += size[b]
+
+    max_range = max((node.comm_range for node in nodes), default=1.0)
+    index = SpatialHash(max_range)
+
+    def revive(i):
+        node = nodes[i]
+        for sink in sinks:
+            dx, dy = node.x - sink.x, node.y - sink.y
+            if dx * dx + dy * dy <= node.comm_range * node.comm_range:
+                union(root, i)
+                break
+        for j in index.neighbors(node.x, node.y, max_range):
+            other = nodes[j]
+            reach = min(node.comm_range, other.comm_range)
+            dx, dy = node.x - other.x, node.y - other.y
+            if dx * dx + dy * dy <= reach * reach:
+                union(i, j)
+        index.insert(i, node.x, node.y)
+
+    dead = set(death_order)
+    for i in range(len(nodes)):
+        if i not in dead:
+            revive(i)
+    counts = []
+    for i in reversed(death_order):
+        counts.append(size[find(root)])
+        revive(i)
+    counts.reverse()
+    return counts
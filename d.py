@@ -1,110 +1,13 @@
 import sys
-import random
 import math
 import csv
-from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, 
                             QDialog, QTextEdit, QDialogButtonBox, QLabel)
 from PyQt6.QtGui import (QPainter, QColor, QPen, QFont, QImage, QBrush, QRadialGradient, 
                         QLinearGradient, QPainterPath, QPolygonF)
 from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QPointF, QRectF
-
-# Sensor Node class with LPWAN and adaptive duty cycle
-class SensorNode:
-    def __init__(self, id, x, y, data_type, battery=100.0, sensing_range=10.0, comm_range=1000.0):
-        self.id = id
-        self.x = x
-        self.y = y
-        self.battery = battery
-        self.sensing_range = sensing_range
-        self.comm_range = comm_range  # Increased for LPWAN
-        self.active = True
-        self.data_type = data_type
-        self.data = {self.data_type: 0.0}
-        self.energy_per_sense = 0.02  # Reduced for LPWAN
-        self.energy_per_transmit = 0.05  # Reduced for LPWAN
-        self.duty_cycle = 1.0  # Percentage of time active (1.0 = always active)
-        self.sleep_time = 0  # Cycles to sleep
-        self.last_value = None  # For data criticality
-        self.critical_thresholds = {
-            'moisture': (30, 70),  # Critical if <30% or >70%
-            'temperature': (20, 30),  # Critical if <20°C or >30°C
-            'humidity': (30, 70),  # Critical if <30% or >70%
-            'light': (200, 800),  # Critical if <200 or >800 µmol/m²/s
-            'ph': (6.0, 7.0)  # Critical if <6.0 or >7.0
-        }
-
-    def update_duty_cycle(self):
-        # Adjust duty cycle based on battery and data criticality
-        if self.battery <= 0:
-            self.active = False
-            self.duty_cycle = 0.0
-            return
-        # Battery-based adjustment
-        if self.battery < 20:
-            self.duty_cycle = 0.2  # Low battery: sense/transmit less often
-        elif self.battery < 50:
-            self.duty_cycle = 0.5
-        else:
-            self.duty_cycle = 1.0
-        # Data criticality adjustment
-        if self.last_value is not None:
-            low, high = self.critical_thresholds[self.data_type]
-            if self.last_value < low or self.last_value > high:
-                self.duty_cycle = min(self.duty_cycle * 2, 1.0)  # Increase frequency for critical data
-
-    def sense_environment(self):
-        if not self.active or self.battery <= 0 or self.sleep_time > 0:
-            self.active = False if self.battery <= 0 else self.active
-            self.sleep_time -= 1 if self.sleep_time > 0 else 0
-            return None
-        if random.random() > self.duty_cycle:
-            self.sleep_time = 1  # Skip this cycle
-            return None
-        if self.data_type == 'moisture':
-            self.data['moisture'] = random.uniform(20, 80)
-        elif self.data_type == 'temperature':
-            self.data['temperature'] = random.uniform(15, 35)
-        elif self.data_type == 'humidity':
-            self.data['humidity'] = random.uniform(20, 80)
-        elif self.data_type == 'light':
-            self.data['light'] = random.uniform(100, 1000)
-        elif self.data_type == 'ph':
-            self.data['ph'] = random.uniform(5.5, 7.5)
-        self.last_value = list(self.data.values())[0]
-        self.battery -= self.energy_per_sense
-        self.update_duty_cycle()
-        if self.battery <= 0:
-            self.active = False
-        return self.data
-
-    def transmit_data(self, base_station):
-        if not self.active or self.battery <= 0 or self.sleep_time > 0:
-            self.active = False if self.battery <= 0 else self.active
-            return False
-        distance = math.sqrt((self.x - base_station.x)**2 + (self.y - base_station.y)**2)
-        if distance <= self.comm_range:
-            self.battery -= self.energy_per_transmit * (distance / self.comm_range)
-            if self.battery <= 0:
-                self.active = False
-            return True
-        return False
-
-# Base Station class
-class BaseStation:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.collected_data = []
-
-    def receive_data(self, node_id, data, duty_cycle):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.collected_data.append({
-            'node_id': node_id,
-            'timestamp': timestamp,
-            'data': data,
-            'duty_cycle': duty_cycle
-        })
+from network import LPWANSensorNode as SensorNode, BaseStation
+from engine import Engine
 
 # Field Canvas for visualizing nodes, base station, transmissions, and data
 class FieldCanvas(QWidget):
@@ -277,6 +180,7 @@ class WSNMainWindow(QMainWindow):
         self.nodes = []
         self.base_station = BaseStation(self.field_size[0] / 2, self.field_size[1] / 2)
         self.setup_nodes()
+        self.engine = Engine(self.nodes, self.base_station)
         self.cycle = 0
         self.max_cycles = 5
         self.cycle_data = []  # Store data per cycle for CSV
@@ -368,8 +272,9 @@ class WSNMainWindow(QMainWindow):
 
         active_nodes = 0
         self.status_label.setText(f"Cycle {self.cycle}/{self.max_cycles}")
+        readings = self.engine.step()
         cycle_data_point = {
-            'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'timestamp': self.engine.clock.format(self.engine.cycle),
             'temperature': 'N/A',
             'moisture': 'N/A',
             'humidity': 'N/A',
@@ -377,20 +282,13 @@ class WSNMainWindow(QMainWindow):
             'ph': 'N/A'
         }
         
-        for node in self.nodes:
-            if not node.active:
-                continue
-            data = node.sense_environment()
-            if data:
-                active_nodes += 1
-                if node.transmit_data(self.base_station):
-                    self.base_station.receive_data(node.id, data, node.duty_cycle)
-                    self.canvas.add_transmission_and_data(node.x, node.y, node.id, data, node.battery, node.data_type, node.duty_cycle)
-                    data_type = list(data.keys())[0]
-                    value = list(data.values())[0]
-                    cycle_data_point[data_type] = f"{value:.1f}"
-                else:
-                    self.status_label.setText(f"Node {node.id} failed to transmit")
+        for node, value, delivered in readings:
+            active_nodes += 1
+            if delivered:
+                self.canvas.add_transmission_and_data(node.x, node.y, node.id, {node.data_type: value}, node.battery, node.data_type, node.duty_cycle)
+                cycle_data_point[node.data_type] = f"{value:.1f}"
+            else:
+                self.status_label.setText(f"Node {node.id} failed to transmit")
         
         self.cycle_data.append(cycle_data_point)
         self.canvas.update()
@@ -437,12 +335,12 @@ class WSNMainWindow(QMainWindow):
             border: none;
         """)
         summary_text = (
-            f"Total Data Points Collected: {len(self.base_station.collected_data)}\n"
+            f"Total Data Points Collected: {self.base_station.collected_data.total}\n"
             f"Dead Nodes: {sum(1 for node in self.nodes if not node.active)}/{len(self.nodes)}\n"
             f"Data saved to 'wsn_data.csv'\n\n"
             "Last 5 Data Points:\n"
         )
-        for data in self.base_station.collected_data[-5:]:
+        for data in self.base_station.collected_data.last(5):
             data_type = list(data['data'].keys())[0]
             value = list(data['data'].values())[0]
             unit = '%' if data_type in ['moisture', 'humidity'] else 'µmol/m²/s' if data_type == 'light' else '°C' if data_type == 'temperature' else ''
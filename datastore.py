@@ -0,0 +1,179 @@
+import math
+import numpy as np
+from network import DATA_TYPES
+
+TYPE_CODES = {data_type: code for code, data_type in enumerate(DATA_TYPES)}
+# name: dtype, fill for rows that don't set it
+COLUMNS = {
+    'node_id': (np.int64, 0),
+    'tick': (np.int64, 0),
+    'type': (np.int8, 0),
+    'value': (np.float64, np.nan),
+    'duty_cycle': (np.float64, np.nan),  # NaN: not reported
+    'count': (np.int32, 1),  # Readings combined into the row (aggregates)
+    'minimum': (np.float64, np.nan),  # NaN for plain readings
+    'maximum': (np.float64, np.nan),
+}
+
+# Columnar store for the readings a sink receives: one typed array per field instead of a
+# dict per reading. Capacity grows in chunks; with retention set it stops growing there and
+# becomes a ring buffer keeping the newest `retention` rows. total counts every row ever
+# received. columns() exports the rows as array views, and indexing or iterating yields
+# the old collected_data dicts, built only for the rows asked for. Single appends are
+# staged in a list and written to the columns a chunk at a time (or when read).
+class ReadingStore:
+    def __init__(self, retention=None, chunk=4096, formatter=None):
+        if retention is not None and retention < 1:
+            raise ValueError("retention must be at least one row")
+        self.retention = retention
+        self.chunk = chunk
+        self.formatter = formatter  # tick -> timestamp string for the row dicts
+        self.total = 0
+        self._start = 0  # Slot of the oldest row
+        self._len = 0
+        self._cap = 0
+        self._cols = {name: np.empty(0, dtype=dtype) for name, (dtype, _) in COLUMNS.items()}
+        self._staged = []
+
+    def __len__(self):
+        self.flush()
+        return self._len
+
+    def flush(self):
+        if self._staged:
+            staged = self._staged
+            self._staged = []
+            self.total -= len(staged)  # Counted on append
+            self._write(*(list(column) for column in zip(*staged)))
+
+    def _grow(self, need):
+        # Reallocate for need rows (rounded up to whole chunks, at least doubling), oldest row first
+        cap = max(need, 2 * self._cap)
+        cap = -(-cap // self.chunk) * self.chunk
+        if self.retention is not None:
+            cap = min(cap, self.retention)
+        order = self._slots(0, self._len)
+        for name, col in self._cols.items():
+            grown = np.empty(cap, dtype=col.dtype)
+            grown[:self._len] = col[order]
+            self._cols[name] = grown
+        self._start = 0
+        self._cap = cap
+
+    def _slots(self, first, count):
+        return (self._start + first + np.arange(count)) % self._cap if self._cap else np.arange(0)
+
+    def extend(self, node_ids, tick, types, values, duty_cycles=None, counts=None, minimums=None, maximums=None):
+        # Append rows from equal-length sequences; types are data type names or codes.
+        # tick is one value for the batch or one per row.
+        self.flush()
+        if len(types) and isinstance(types[0], str):
+            types = [TYPE_CODES[t] for t in types]
+        self._write(node_ids, tick, types, values, duty_cycles, counts, minimums, maximums)
+
+    def _write(self, node_ids, tick, types, values, duty_cycles=None, counts=None, minimums=None, maximums=None):
+        n = len(node_ids)
+        if n == 0:
+            return
+        self.total += n
+        if self.retention is not None and n > self.retention:
+            # Only the newest retention rows survive
+            skip = n - self.retention
+            node_ids, values = node_ids[skip:], values[skip:]
+            types = types[skip:]
+            tick = tick if np.isscalar(tick) else tick[skip:]
+            duty_cycles = None if duty_cycles is None else duty_cycles[skip:]
+            counts = None if counts is None else counts[skip:]
+            minimums = None if minimums is None else minimums[skip:]
+            maximums = None if maximums is None else maximums[skip:]
+            n = self.retention
+        if self._len + n > self._cap and (self.retention is None or self._cap < self.retention):
+            self._grow(self._len + n)
+        if self._len + n > self._cap:
+            # Full ring: drop the oldest rows to make room
+            drop = self._len + n - self._cap
+            self._start = (self._start + drop) % self._cap
+            self._len -= drop
+        slots = self._slots(self._len, n)
+        cols = self._cols
+        cols['node_id'][slots] = node_ids
+        cols['tick'][slots] = tick
+        cols['type'][slots] = types
+        cols['value'][slots] = values
+        for name, given in (('duty_cycle', duty_cycles), ('count', counts), ('minimum', minimums),
+                            ('maximum', maximums)):
+            cols[name][slots] = COLUMNS[name][1] if given is None else given
+        self._len += n
+
+    def append(self, node_id, tick, data_type, value, duty_cycle=None, count=1, minimum=None, maximum=None):
+        nan = math.nan
+        self.total += 1
+        self._staged.append((node_id, tick, TYPE_CODES[data_type], value, nan if duty_cycle is None else duty_cycle,
+                             count, nan if minimum is None else minimum, nan if maximum is None else maximum))
+        if len(self._staged) >= self.chunk:
+            self.flush()
+
+    def __getstate__(self):
+        # Only the retained rows, oldest first, without the spare capacity
+        self.flush()
+        state = dict(self.__dict__)
+        state['_cols'] = {name: np.ascontiguousarray(col) for name, col in self.columns().items()}
+        state['_start'] = 0
+        state['_cap'] = self._len
+        return state
+
+    def segments(self):
+        # Zero-copy: one or two (start, stop) slot ranges, oldest rows first
+        self.flush()
+        end = self._start + self._len
+        if end <= self._cap:
+            return [(self._start, end)]
+        return [(self._start, self._cap), (0, end - self._cap)]
+
+    def columns(self, names=None):
+        # {name: array} of the retained rows in arrival order. Views into the store while the
+        # rows are contiguous (always, until a ring buffer wraps); a copy otherwise.
+        names = list(COLUMNS) if names is None else names
+        parts = self.segments()
+        if len(parts) == 1:
+            lo, hi = parts[0]
+            return {name: self._cols[name][lo:hi] for name in names}
+        return {name: np.concatenate([self._cols[name][lo:hi] for lo, hi in parts]) for name in names}
+
+    def timestamp(self, tick):
+        return self.formatter(tick) if self.formatter is not None else f"cycle {tick}"
+
+    def row(self, i):
+        # The reading as a collected_data dict (aggregates carry count/min/max)
+        self.flush()
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("reading index out of range")
+        slot = (self._start + i) % self._cap
+        cols = self._cols
+        duty = float(cols['duty_cycle'][slot])
+        row = {
+            'node_id': int(cols['node_id'][slot]),
+            'timestamp': self.timestamp(int(cols['tick'][slot])),
+            'data': {DATA_TYPES[cols['type'][slot]]: float(cols['value'][slot])},
+            'duty_cycle': None if math.isnan(duty) else duty,
+        }
+        minimum = float(cols['minimum'][slot])
+        if not math.isnan(minimum):
+            row['count'] = int(cols['count'][slot])
+            row['min'] = minimum
+            row['max'] = float(cols['maximum'][slot])
+        return row
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+        return self.row(index)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def last(self, n):
+        return self[-n:] if n else []
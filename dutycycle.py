@@ -0,0 +1,66 @@
+from bisect import bisect_right
+import numpy as np
+from network import DATA_TYPES, CRITICAL_THRESHOLDS
+
+# Adaptive duty-cycle policy declared as threshold tables: the battery breakpoints pick a
+# duty level (levels has one more entry than breakpoints), and a last reading outside its
+# type's critical (low, high) band multiplies the duty by critical_boost, capped at 1.
+# evaluate() works on whole node columns; duty_for() is the same rule for one node.
+# The defaults are the rule LPWAN nodes follow without a policy (network.default_policy()).
+class DutyCyclePolicy:
+    def __init__(self, breakpoints=(20, 50), levels=(0.2, 0.5, 1.0), critical_thresholds=None,
+                 critical_boost=2.0):
+        if len(levels) != len(breakpoints) + 1:
+            raise ValueError("a policy needs one more duty level than battery breakpoints")
+        if list(breakpoints) != sorted(breakpoints):
+            raise ValueError("battery breakpoints must be ascending")
+        self.breakpoints = list(breakpoints)
+        self.levels = list(levels)
+        self.critical_thresholds = dict(CRITICAL_THRESHOLDS if critical_thresholds is None else critical_thresholds)
+        self.critical_boost = critical_boost
+        self._breakpoints = np.array(self.breakpoints, dtype=np.float64)
+        self._levels = np.array(self.levels, dtype=np.float64)
+        self._low = np.array([self.critical_thresholds[t][0] for t in DATA_TYPES], dtype=np.float64)
+        self._high = np.array([self.critical_thresholds[t][1] for t in DATA_TYPES], dtype=np.float64)
+
+    def evaluate(self, battery, last_value, codes, draws=None):
+        # Duty cycle per node from battery and last reading (NaN: none yet). With draws
+        # (uniform [0, 1) per node) also returns the sleep mask: nodes skipping this cycle.
+        duty = self._levels[np.searchsorted(self._breakpoints, battery, side='right')]
+        critical = (last_value < self._low[codes]) | (last_value > self._high[codes])  # NaN compares False
+        duty = np.where(critical, np.minimum(duty * self.critical_boost, 1.0), duty)
+        duty[battery <= 0] = 0.0
+        return duty, None if draws is None else self.sleep_mask(duty, draws)
+
+    @staticmethod
+    def sleep_mask(duty, draws):
+        return draws > duty
+
+    def band(self, battery):
+        # (base duty level, battery level at which the band ends) for one battery level
+        k = bisect_right(self.breakpoints, battery)
+        return self.levels[k], self.breakpoints[k - 1] if k else 0.0
+
+    def bands(self, battery):
+        # Vectorized band()
+        k = np.searchsorted(self._breakpoints, battery, side='right')
+        return self._levels[k], np.concatenate(([0.0], self._breakpoints))[k]
+
+    def duty_for(self, battery, last_value, data_type):
+        if battery <= 0:
+            return 0.0
+        duty = self.levels[bisect_right(self.breakpoints, battery)]
+        if last_value is not None:
+            low, high = self.critical_thresholds[data_type]
+            if last_value < low or last_value > high:
+                duty = min(duty * self.critical_boost, 1.0)
+        return duty
+
+# Named presets for sweeps
+POLICIES = {
+    'default': DutyCyclePolicy(),
+    'always-on': DutyCyclePolicy((), (1.0,), critical_boost=1.0),
+    'battery-only': DutyCyclePolicy(critical_boost=1.0),
+    'frugal': DutyCyclePolicy((20, 50, 80), (0.1, 0.25, 0.5, 0.75)),
+    'event-driven': DutyCyclePolicy((20,), (0.05, 0.25), critical_boost=4.0),
+}
@@ -0,0 +1,674 @@
+import sys
+import time
+import math
+import random
+import heapq
+import argparse
+from datetime import datetime
+from network import DATA_TYPES, SensorNode, LPWANSensorNode, BaseStation, default_policy
+from scheduler import EventQueue, WAKE, SENSE, TRANSMIT, DEATH
+from aggregation import AGGREGATE_SCALE, add_reading, merge
+from simclock import SimClock
+
+# Node placement helpers
+def ring_layout(num_nodes, field_size, radius=20):
+    cx, cy = field_size[0] / 2, field_size[1] / 2
+    positions = []
+    for i in range(num_nodes):
+        angle = 2 * math.pi * i / num_nodes
+        positions.append((cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+    return positions
+
+def random_layout(num_nodes, field_size, rng=random):
+    return [(rng.uniform(0, field_size[0]), rng.uniform(0, field_size[1])) for _ in range(num_nodes)]
+
+def build_nodes(positions, node_class=SensorNode, **kwargs):
+    return [node_class(id=i, x=x, y=y, data_type=DATA_TYPES[i % len(DATA_TYPES)], **kwargs)
+            for i, (x, y) in enumerate(positions)]
+
+# Headless simulation engine, advances the network without any GUI or timer
+class Engine:
+    def __init__(self, nodes, base_station, seed=None, backend='objects', multihop=False, leach=None,
+                 aggregate=False, environment=None, channel=None, policy=None, wake_queue=False, streams=False,
+                 clock=None):
+        # base_station may be a single BaseStation or a list of gateways.
+        # aggregate combines readings per data type at relays (multihop) or cluster heads (leach).
+        # environment is an optional model nodes read from (fields.EnvironmentField, weather.WeatherModel).
+        # channel is an optional MAC/collision stage (collision.AlohaChannel, mac.CSMAChannel) for
+        # single-hop uplinks.
+        # policy is an optional dutycycle.DutyCyclePolicy for LPWAN nodes (the array backend's default).
+        # wake_queue samples each LPWAN node's run of missed duty-cycle gates at once and parks it
+        # until its next sensing cycle, instead of waking it every other cycle to draw again.
+        # Same statistics, different random stream.
+        # streams gives every (node, cycle, purpose) its own counter-based stream (streams.CounterRNG)
+        # instead of one shared sequence, so results no longer depend on visiting order and both
+        # backends agree bit for bit on node draws.
+        # clock (simclock.SimClock) maps cycles to simulated time; readings are stamped with the
+        # cycle and formatted through it when read.
+        self.nodes = nodes
+        self.base_stations = list(base_station) if isinstance(base_station, (list, tuple)) else [base_station]
+        self.base_station = self.base_stations[0]
+        self.assignment = [-1] * len(nodes)  # Index of each node's sink in base_stations
+        self._sink_positions = None
+        self.streams = streams
+        if streams:
+            from streams import CounterRNG
+            self.rng = CounterRNG(seed)
+        else:
+            self.rng = random.Random(seed)
+        self.clock = clock if clock is not None else SimClock()
+        for sink in self.base_stations:
+            sink.collected_data.formatter = self.clock.format
+        self.cycle = 0
+        self.backend = backend
+        self.array = None
+        self.queue = EventQueue()
+        self.deaths = []  # (cycle, node_id) in the order batteries ran out
+        self.index = None  # SpatialHash of live nodes, see build_index()
+        self.router = None  # Multi-hop Router when multihop=True
+        self.connectivity = None  # ConnectivityTracker, see track_connectivity()
+        self.clustering = None  # LEACH protocol when leach=<cluster-head probability>
+        self.aggregate = aggregate
+        self.environment = environment
+        self._dead = set()
+        self._readings = []
+        self._inbox = {}  # Pending aggregates per relay during a multi-hop cycle
+        self._sources = {}  # {relay: {data_type: [positions in _readings]}} behind each pending aggregate
+        self.channel = channel
+        self.skipped = 0  # Cycles jumped over by fast_forward()
+        self.wake_queue = wake_queue
+        self._uplinks = []  # (reading position, node index, sink index, distance) awaiting the channel
+        if backend == 'array':
+            from nodearray import NodeArray
+            self.array = NodeArray.from_nodes(nodes)
+            self._alive = int(self.array.active.sum())
+            lpwan = sum(isinstance(node, LPWANSensorNode) for node in nodes)
+            if lpwan:
+                if lpwan < len(nodes):
+                    raise ValueError("the array backend needs all nodes or none to be LPWAN nodes")
+                if any(node.radio is not None for node in nodes):
+                    raise ValueError("the array backend does not model the LoRa radio")
+                self.array.policy = policy or nodes[0].policy or default_policy()
+                if wake_queue:
+                    self.array.enable_wake_queue(self.rng)
+        elif backend == 'objects':
+            if policy is not None:
+                for node in nodes:
+                    if isinstance(node, LPWANSensorNode):
+                        node.policy = policy
+            for i, node in enumerate(nodes):
+                if node.active:
+                    if wake_queue and isinstance(node, LPWANSensorNode):
+                        node.plan_sleep(self.node_rng(node, 'sleep'))
+                    wake = node.next_wake(0)
+                    self.queue.schedule(wake, i, WAKE if wake > 1 else SENSE)
+            self._alive = len(self.queue)
+        else:
+            raise ValueError(f"unknown backend: {backend}")
+        if multihop:
+            if self.array is not None:
+                raise ValueError("multi-hop routing needs the objects backend")
+            from routing import Router
+            # Radios reach kilometres at SF12 but relay over SF7 hops; size the index for those
+            radios = [node.radio for node in nodes if getattr(node, 'radio', None) is not None]
+            hop_range = radios[0].relay_range if radios else None
+            self.router = Router(nodes, self.base_stations, self.build_index(hop_range), hop_range)
+            self._sink_positions = [(sink.x, sink.y) for sink in self.base_stations]
+        if leach is not None:
+            if self.array is None:
+                raise ValueError("LEACH clustering needs the array backend")
+            from clustering import LEACH
+            self.clustering = LEACH(self.array, self.base_stations, p=leach, aggregate=aggregate)
+        if aggregate and self.router is None and self.clustering is None:
+            raise ValueError("aggregation needs multi-hop routing or LEACH clustering")
+        if channel is not None and (self.router is not None or self.clustering is not None):
+            raise ValueError("the collision channel models single-hop uplinks only")
+
+    def build_index(self, cell_size=None):
+        # Neighbor index over live nodes, kept up to date as nodes die
+        from spatial import SpatialHash
+        self.sync_nodes()
+        self.index = SpatialHash.from_nodes(self.nodes, cell_size)
+        return self.index
+
+    def assign_sinks(self):
+        # Bulk nearest-gateway assignment; only rerun when a sink has moved
+        from spatial import KDTree
+        positions = [(sink.x, sink.y) for sink in self.base_stations]
+        self._sink_positions = positions
+        if self.array is not None:
+            self.array.assign_sinks(self.base_stations)
+            return
+        tree = KDTree(positions)
+        for i, node in enumerate(self.nodes):
+            self.assignment[i] = tree.nearest(node.x, node.y)[0] if node.active else -1
+
+    def sink_throughput(self):
+        return [sink.received for sink in self.base_stations]
+
+    def track_connectivity(self):
+        # Report sink reachability and partition events as nodes die
+        from connectivity import ConnectivityTracker
+        if self.index is None:
+            self.build_index()
+        self.connectivity = ConnectivityTracker(self.nodes, self.base_stations, self.index)
+        return self.connectivity
+
+    def alive_count(self):
+        return self._alive
+
+    def step(self):
+        self.cycle += 1
+        for sink in self.base_stations:
+            sink.tick = self.cycle
+        if self.environment is not None:
+            self.environment.update(self.cycle)
+        if self.array is not None:
+            return self._step_array()
+        return self._step_objects()
+
+    def _step_objects(self):
+        # Run every node event due this cycle. Returns (node, value, delivered) for each
+        # node that produced a reading, in node order.
+        if [(sink.x, sink.y) for sink in self.base_stations] != self._sink_positions:
+            if self.router is not None:
+                self.router.build()
+                self._sink_positions = [(sink.x, sink.y) for sink in self.base_stations]
+            else:
+                self.assign_sinks()
+        self._readings = []
+        for _, index, kind in self.queue.pop_due(self.cycle):
+            self._handle(index, kind)
+        if self._uplinks:
+            self._resolve_uplinks()
+            # Senders whose transmission drained them
+            for _, index, kind in self.queue.pop_due(self.cycle):
+                self._handle(index, kind)
+        if self._inbox:
+            self._flush_aggregates()
+        return self._readings
+
+    def _handle(self, index, kind):
+        node = self.nodes[index]
+        if kind == WAKE:
+            node.sleep_time = 0
+            kind = SENSE
+        if kind == SENSE:
+            if node.sense_environment(self.node_rng(node, 'sense'), self.environment) is not None:
+                self.queue.schedule(self.cycle, index, TRANSMIT)
+                return
+        elif kind == TRANSMIT:
+            if self.aggregate:
+                # Queue the reading; _flush_aggregates() forwards it at the end of the cycle and
+                # marks it delivered once it reaches a sink
+                delivered = False
+                if node.active and self.router.parent[index] is not None:
+                    add_reading(self._inbox.setdefault(index, {}), node.data_type, node.value)
+                    self._sources.setdefault(index, {}).setdefault(node.data_type, []).append(len(self._readings))
+            elif self.router is not None:
+                sink = self._relay(index)
+                delivered = sink is not None
+            elif self.channel is not None:
+                # Contend for the channel at the end of the cycle (_resolve_uplinks()), which
+                # charges only the packets that go on air and receives the ones that survive
+                sink = self.base_stations[self.assignment[index]]
+                delivered = False
+                if node.reaches(sink):
+                    dx = node.x - sink.x
+                    dy = node.y - sink.y
+                    self._uplinks.append((len(self._readings), index, self.assignment[index],
+                                          math.sqrt(dx * dx + dy * dy)))
+            else:
+                sink = self.base_stations[self.assignment[index]]
+                delivered = node.transmit_data(sink)
+            if delivered and not self.aggregate:
+                sink.receive_reading(node.id, node.data_type, node.value, node.duty_cycle)
+            self._readings.append((node, node.value, delivered))
+        elif kind == DEATH:
+            if index not in self._dead:
+                self._node_died(index)
+            return
+        # Nodes schedule their own next visit; dead nodes leave the queue for good
+        if not node.active:
+            self.queue.schedule(self.cycle, index, DEATH)
+            return
+        if self.wake_queue and kind == TRANSMIT and isinstance(node, LPWANSensorNode):
+            node.plan_sleep(self.node_rng(node, 'sleep'))
+        wake = node.next_wake(self.cycle)
+        self.queue.schedule(wake, index, WAKE if wake > self.cycle + 1 else SENSE)
+
+    def node_rng(self, node, purpose):
+        # The generator a node draws from this cycle
+        if self.streams:
+            return self.rng.stream(node.id, self.cycle, purpose)
+        return self.rng
+
+    def _node_died(self, index):
+        self._dead.add(index)
+        self.deaths.append((self.cycle, self.nodes[index].id))
+        self._alive -= 1
+        self.assignment[index] = -1
+        if self.router is not None:
+            self.router.remove(index)
+        elif self.index is not None and index in self.index:
+            self.index.remove(index)
+        if self.connectivity is not None:
+            self.connectivity.remove(index, self.cycle)
+
+    def _resolve_uplinks(self):
+        uplinks = self._uplinks
+        self._uplinks = []
+        nodes = self.nodes
+        lost = self.channel.resolve([u[3] for u in uplinks], [u[2] for u in uplinks],
+                                    [nodes[u[1]].x for u in uplinks], [nodes[u[1]].y for u in uplinks]).tolist()
+        for (position, index, s, _), dropped, sent in zip(uplinks, lost, self.channel.on_air.tolist()):
+            if not sent:
+                continue
+            nodes[index].transmit_data(self.base_stations[s])
+            if not nodes[index].active:
+                self.queue.schedule(self.cycle, index, DEATH)
+            if dropped:
+                continue
+            node, value, _ = self._readings[position]
+            self.base_stations[s].receive_reading(node.id, node.data_type, value, node.duty_cycle)
+            self._readings[position] = (node, value, True)
+
+    def _relay(self, index):
+        # Forward a reading hop by hop along the router's path; every sender pays for
+        # its own hop. Returns the sink reached, or None if the packet was lost.
+        path = self.router.route(index)
+        if path is None:
+            return None
+        sender = index
+        for hop in path:
+            target = self.router.sink_of(hop) if hop < 0 else self.nodes[hop]
+            sent = self.nodes[sender].transmit_data(target)
+            if not self.nodes[sender].active and sender not in self._dead:
+                self._node_died(sender)
+            if not sent:
+                return None
+            sender = hop
+        return target
+
+    def _flush_aggregates(self):
+        # Convergecast: route costs strictly fall toward the sinks, so flushing the costliest
+        # inbox first lets every relay merge all of its children's aggregates before it
+        # sends one packet per data type to its next hop.
+        router = self.router
+        heap = [(-router.cost[i], i) for i in self._inbox]
+        heapq.heapify(heap)
+        while heap:
+            _, i = heapq.heappop(heap)
+            inbox = self._inbox.pop(i)
+            sources = self._sources.pop(i)
+            hop = router.parent[i]
+            if hop is None:
+                continue
+            node = self.nodes[i]
+            target = router.sink_of(hop) if hop < 0 else self.nodes[hop]
+            # A lone reading goes out as a plain packet, anything combined as an aggregate
+            sent = {data_type: entry for data_type, entry in inbox.items()
+                    if node.transmit_data(target, AGGREGATE_SCALE if entry[0] > 1 else 1.0)}
+            if not node.active and i not in self._dead:
+                self._node_died(i)
+            if not sent:
+                continue
+            if hop < 0:
+                for data_type, (count, total, minimum, maximum) in sent.items():
+                    target.receive_aggregate(node.id, data_type, count, total / count, minimum, maximum)
+                    for position in sources[data_type]:
+                        reading, value, _ = self._readings[position]
+                        self._readings[position] = (reading, value, True)
+            else:
+                if hop not in self._inbox:
+                    self._inbox[hop] = {}
+                    self._sources[hop] = {}
+                    heapq.heappush(heap, (-router.cost[hop], hop))
+                merge(self._inbox[hop], sent)
+                for data_type in sent:
+                    self._sources[hop].setdefault(data_type, []).extend(sources[data_type])
+
+    def idle_until(self):
+        # Last cycle before the next scheduled event, or None when nothing is scheduled
+        next_time = self.queue.next_time()
+        return None if next_time is None else next_time - 1
+
+    def _step_array(self):
+        # Same cycle over NodeArray columns. Returns (sensed, delivered) index arrays.
+        array = self.array
+        aggregates = None
+        if self.clustering is not None:
+            sensed = array.sense(self.rng, self.environment, self.cycle)
+            delivered, via, aggregates = self.clustering.transmit(self.rng, sensed, self.cycle)
+        elif self.channel is not None:
+            # Contend first, then charge only the packets that went on air. As on the objects
+            # backend, nodes drained by sensing die before the ones drained by sending.
+            sensed = array.sense(self.rng, self.environment, self.cycle)
+            for index in sensed[~array.active[sensed]].tolist():
+                self._node_died(index)
+            distance = array.distance_to(self.base_stations)
+            ready = sensed[array.active[sensed] & (distance[sensed] <= array.comm_range[sensed])]
+            delivered = ready
+            if len(ready):
+                lost = self.channel.resolve(distance[ready], array.sink[ready], array.x[ready], array.y[ready])
+                sent = ready[self.channel.on_air]
+                array.transmit(sent, distance[sent])
+                delivered = ready[~lost]
+            via = delivered
+        else:
+            sensed, delivered = array.step(self.rng, self.base_stations, self.environment, self.cycle)
+            via = delivered
+        for index in sensed[~array.active[sensed]].tolist():
+            if index not in self._dead:
+                self._node_died(index)
+        if self.clustering is not None:
+            # Cluster heads relay, and can run out, in cycles they didn't sense in
+            heads = self.clustering.heads
+            for index in heads[~array.active[heads]].tolist():
+                if index not in self._dead:
+                    self._node_died(index)
+        array.park(sensed, self.rng, self.cycle)
+        if aggregates is not None:
+            heads, codes, counts, means, minimums, maximums = aggregates
+            for s, sink in enumerate(self.base_stations):
+                rows = array.sink[heads] == s
+                sink.receive_aggregates(array.ids[heads[rows]], codes[rows], counts[rows], means[rows],
+                                        minimums[rows], maximums[rows])
+        by_sink = [delivered] if len(self.base_stations) == 1 else \
+            [delivered[array.sink[via] == s] for s in range(len(self.base_stations))]
+        for sink, indices in zip(self.base_stations, by_sink):
+            sink.receive_many(array.ids[indices], array.data_type[indices], array.value[indices],
+                              array.duty_cycle[indices])
+        return sensed, delivered
+
+    def sync_nodes(self):
+        if self.array is not None:
+            self.array.sync_to(self.nodes)
+
+    def _steady_drain(self):
+        # Objects version of NodeArray.steady_drain()
+        live, cost, floor, delivering = [], [], [], []
+        for i, node in enumerate(self.nodes):
+            if not node.active:
+                continue
+            bottom = 0.0
+            if isinstance(node, LPWANSensorNode):
+                level, bottom = (node.policy or default_policy()).band(node.battery)
+                if level < 1.0 or node.duty_cycle < 1.0 or node.sleep_time:
+                    return None
+            sink = self.base_stations[self.assignment[i]]
+            dx = node.x - sink.x
+            dy = node.y - sink.y
+            distance = math.sqrt(dx * dx + dy * dy)
+            if isinstance(node, LPWANSensorNode) and node.radio is not None:
+                packet = node.radio.packet_energy(distance)
+                transmit = 0.0 if packet is None else packet[2]
+                reached = packet is not None
+            else:
+                reached = distance <= node.comm_range
+                transmit = node.energy_per_transmit * (distance / node.comm_range) if reached else 0.0
+            live.append(i)
+            cost.append(node.energy_per_sense + transmit)
+            floor.append(bottom)
+            delivering.append(reached)
+        return live, cost, floor, delivering
+
+    def fast_forward(self, end):
+        # Closed-form jump over steady cycles, in which every live node senses and sends
+        # straight to its sink each cycle at a fixed cost. Stops a full cycle short of the
+        # first node death or duty-cycle band change, which are then stepped normally.
+        # Readings from skipped cycles are counted at the sinks but not stored, and the
+        # skipped sense gates draw no random numbers. Returns the number of cycles skipped.
+        if self.router is not None or self.clustering is not None or self.channel is not None:
+            return 0
+        if [(sink.x, sink.y) for sink in self.base_stations] != self._sink_positions:
+            self.assign_sinks()
+        array = self.array
+        steady = array.steady_drain(self.base_stations, self.cycle) if array is not None else self._steady_drain()
+        if steady is None or len(steady[0]) == 0:
+            return 0
+        import numpy as np
+        live, cost, floor, delivering = (np.asarray(column) for column in steady)
+        nodes = self.nodes
+        battery = array.battery[live] if array is not None else np.array([nodes[i].battery for i in live.tolist()])
+        # b - k * cost >= floor + cost keeps every node alive and in its band through cycle k
+        skip = min(int(np.min(np.floor((battery - floor) / cost))) - 1, end - self.cycle)
+        if skip < 2:
+            return 0
+        drained = battery - skip * cost
+        if array is not None:
+            array.battery[live] = drained
+            sinks = array.sink[live]
+        else:
+            for i, b in zip(live.tolist(), drained.tolist()):
+                nodes[i].battery = b
+            sinks = np.array([self.assignment[i] for i in live.tolist()], dtype=np.int64)
+        counts = np.bincount(sinks[delivering], minlength=len(self.base_stations))
+        for sink, count in zip(self.base_stations, counts.tolist()):
+            sink.received += skip * count
+        self.cycle += skip
+        self.skipped += skip
+        if array is None:
+            # Every live node's next event is a SENSE on the cycle after the jump
+            self.queue.clear()
+            for i in live.tolist():
+                self.queue.schedule(self.cycle + 1, i, SENSE)
+        elif array.wheel is not None:
+            array.wheel = {self.cycle + 1: [live]}
+            array.wake_at[live] = self.cycle + 1
+        return skip
+
+    def run(self, cycles, stop_when_depleted=True, fast_forward=False, checkpoint_every=None,
+            checkpoint_path='engine-{cycle}.ckpt'):
+        # checkpoint_every: save() to checkpoint_path (formatted with the cycle) every that many cycles.
+        # Fast-forward and idle jumps stop short of each checkpoint cycle, which is then stepped.
+        end = self.cycle + cycles
+        due = None if not checkpoint_every else (self.cycle // checkpoint_every + 1) * checkpoint_every
+        while self.cycle < end:
+            limit = end if due is None else min(end, due - 1)
+            if fast_forward and self.fast_forward(limit):
+                continue
+            if self.array is None:
+                # Jump straight over cycles in which no node has anything to do
+                idle = self.idle_until()
+                if idle is None:
+                    if stop_when_depleted:
+                        break
+                    idle = end
+                if idle >= end:
+                    self.cycle = max(self.cycle, end)
+                    break
+                self.cycle = max(self.cycle, min(idle, limit))
+            self.step()
+            if due is not None and self.cycle >= due:
+                self.save(checkpoint_path.format(cycle=self.cycle))
+                due = (self.cycle // checkpoint_every + 1) * checkpoint_every
+            if stop_when_depleted and self.alive_count() == 0:
+                break
+        self.sync_nodes()
+        return self.summary()
+
+    def save(self, path):
+        # Snapshot the whole engine; checkpoint.load(path) resumes or forks it
+        import checkpoint
+        return checkpoint.save(self, path)
+
+    def summary(self):
+        return {
+            'cycles': self.cycle,
+            'data_points': sum(sink.collected_data.total for sink in self.base_stations),
+            'sink_throughput': self.sink_throughput(),
+            'dead_nodes': len(self.nodes) - self.alive_count(),
+            'nodes': len(self.nodes),
+            'reachable': None if self.connectivity is None else self.connectivity.reachable,
+        }
+
+def grid_sinks(num_sinks, field_size, retention=None):
+    # Spread gateways over a near-square grid, one per grid cell centre
+    cols = math.ceil(math.sqrt(num_sinks))
+    rows = math.ceil(num_sinks / cols)
+    return [BaseStation(field_size[0] * ((i % cols) + 0.5) / cols, field_size[1] * ((i // cols) + 0.5) / rows,
+                        retention) for i in range(num_sinks)]
+
+def build_engine(num_nodes=5, field_size=(100, 100), layout='ring', lpwan=False, comm_range=None, seed=None,
+                 backend='objects', sinks=1, multihop=False, leach=None, aggregate=False, field_length=None,
+                 weather=False, minutes_per_cycle=10, soil_resolution=None, radio=False, mac=None,
+                 channels=3, capture_db=6.0, policy=None, wake_queue=False, node_attrs=None,
+                 streams=False, retention=None, epoch=None):
+    # node_attrs: extra attributes set on every node, e.g. {'energy_per_sense': 0.05}
+    # policy: a dutycycle.POLICIES name or a DutyCyclePolicy
+    # retention: newest readings each sink keeps (a ring buffer drops the oldest); None keeps all
+    # epoch: datetime of cycle 0; each cycle lasts minutes_per_cycle
+    if sinks < 1:
+        raise ValueError("the network needs at least one sink")
+    rng = random.Random(seed)
+    if layout == 'ring':
+        positions = ring_layout(num_nodes, field_size)
+    else:
+        positions = random_layout(num_nodes, field_size, rng)
+    node_class = LPWANSensorNode if lpwan else SensorNode
+    kwargs = {} if comm_range is None else {'comm_range': comm_range}
+    nodes = build_nodes(positions, node_class, **kwargs)
+    for name, value in (node_attrs or {}).items():
+        for node in nodes:
+            setattr(node, name, value)
+    model = None
+    if radio or mac is not None:
+        from radio import LoRaRadio
+        model = LoRaRadio()
+    if radio:
+        # Link budget decides reach and cost instead of comm_range and energy_per_transmit
+        if not lpwan:
+            raise ValueError("the radio model needs LPWAN nodes")
+        for node in nodes:
+            node.radio = model
+            node.comm_range = model.max_range
+    clock = SimClock(minutes_per_cycle * 60) if epoch is None else SimClock(minutes_per_cycle * 60, epoch)
+    environment = None
+    if field_length is not None:
+        from fields import EnvironmentField
+        environment = EnvironmentField(field_size, length=field_length, seed=seed)
+    elif weather or soil_resolution is not None:
+        from weather import WeatherModel
+        codes = [DATA_TYPES.index(node.data_type) for node in nodes]
+        # The weather starts on the clock's date and time of cycle 1
+        day = clock.day_of_year(1)
+        environment = WeatherModel(codes, minutes_per_cycle=minutes_per_cycle, start_day=int(day),
+                                   start_hour=(day - int(day)) * 24, seed=seed)
+        if soil_resolution is not None:
+            from soil import SoilMoistureGrid
+            environment = SoilMoistureGrid(field_size, environment, resolution=soil_resolution, seed=seed)
+    channel = None
+    if mac is not None:
+        # Each cycle's uplinks spread over the cycle's length in seconds
+        if mac == 'aloha':
+            from collision import AlohaChannel as channel_class
+        elif mac == 'csma':
+            from mac import CSMAChannel as channel_class
+        else:
+            raise ValueError(f"unknown MAC: {mac}")
+        channel = channel_class(model, window=minutes_per_cycle * 60, channels=channels, capture_db=capture_db,
+                                seed=seed)
+    if isinstance(policy, str):
+        from dutycycle import POLICIES
+        if policy not in POLICIES:
+            raise ValueError(f"unknown duty-cycle policy: {policy}")
+        policy = POLICIES[policy]
+    return Engine(nodes, grid_sinks(sinks, field_size, retention), seed=seed, backend=backend, multihop=multihop,
+                  leach=leach, aggregate=aggregate, environment=environment, channel=channel, policy=policy,
+                  wake_queue=wake_queue, streams=streams, clock=clock)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the WSN agriculture simulation headless")
+    parser.add_argument('--nodes', type=int, default=5)
+    parser.add_argument('--cycles', type=int, default=5)
+    parser.add_argument('--field', type=float, nargs=2, default=(100, 100), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--layout', choices=['ring', 'random'], default='ring')
+    parser.add_argument('--comm-range', type=float, default=None)
+    parser.add_argument('--lpwan', action='store_true', help="use LPWAN nodes with adaptive duty cycle")
+    parser.add_argument('--radio', action='store_true',
+                        help="LoRa link model: path loss, spreading factors, airtime-based energy (implies --lpwan)")
+    parser.add_argument('--mac', choices=['aloha', 'csma'], default=None,
+                        help="uplink medium access with collisions, over --minutes-per-cycle long windows")
+    parser.add_argument('--channels', type=int, default=3, help="uplink channels (--mac)")
+    parser.add_argument('--capture-db', type=float, default=6.0,
+                        help="power advantage that survives a collision (--mac); negative disables capture")
+    parser.add_argument('--policy', default=None, metavar='NAME',
+                        help="named duty-cycle policy from dutycycle.POLICIES (implies --lpwan)")
+    parser.add_argument('--wake-queue', action='store_true',
+                        help="park duty-cycled nodes until their next sensing cycle (sampled in one draw)")
+    parser.add_argument('--streams', action='store_true',
+                        help="per-node counter-based random streams (same results for either backend)")
+    parser.add_argument('--retention', type=int, default=None, metavar='N',
+                        help="keep only the newest N readings per sink (counts still cover every reading)")
+    parser.add_argument('--sinks', type=int, default=1, help="number of gateways, laid out on a grid")
+    parser.add_argument('--multihop', action='store_true', help="relay over minimum-energy multi-hop routes")
+    parser.add_argument('--leach', type=float, default=None, metavar='P',
+                        help="LEACH clustering with cluster-head probability P (array backend)")
+    parser.add_argument('--aggregate', action='store_true',
+                        help="combine readings per data type at relays or cluster heads")
+    parser.add_argument('--field-length', type=float, default=None, metavar='L',
+                        help="read spatially correlated fields with correlation length L instead of uniform noise")
+    parser.add_argument('--weather', action='store_true',
+                        help="read diurnal/seasonal time series (temperature, light, rain-fed moisture)")
+    parser.add_argument('--minutes-per-cycle', type=float, default=10, help="simulated minutes per cycle")
+    parser.add_argument('--epoch', type=datetime.fromisoformat, default=None, metavar='ISO',
+                        help="simulated date and time of cycle 0, e.g. 2025-04-01T06:00 (default: 2025-06-21)")
+    parser.add_argument('--soil', type=float, default=None, metavar='RES',
+                        help="moisture from a diffusing/evaporating soil grid with RES cells per unit (implies --weather)")
+    parser.add_argument('--connectivity', action='store_true', help="track sink reachability and partitions")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--backend', choices=['objects', 'array'], default='objects',
+                        help="per-object nodes or vectorized NumPy node columns")
+    parser.add_argument('--fast-forward', action='store_true',
+                        help="jump over steady battery drain in closed form (single-hop only)")
+    parser.add_argument('--keep-running', action='store_true', help="don't stop when all nodes are depleted")
+    parser.add_argument('--checkpoint-every', type=int, default=None, metavar='N',
+                        help="snapshot the engine every N cycles")
+    parser.add_argument('--checkpoint', default='engine-{cycle}.ckpt', metavar='PATH',
+                        help="snapshot file name, {cycle} is replaced by the cycle (default: engine-{cycle}.ckpt)")
+    parser.add_argument('--resume', default=None, metavar='PATH',
+                        help="continue from a snapshot for --cycles more cycles (network options are ignored)")
+    args = parser.parse_args(argv)
+    if (args.weather or args.soil is not None) and args.field_length is not None:
+        parser.error("--weather/--soil and --field-length are mutually exclusive")
+    if args.sinks < 1:
+        parser.error("--sinks must be at least 1")
+
+    lpwan = args.lpwan or args.radio or args.policy is not None
+    if args.resume is not None:
+        import checkpoint
+        engine = checkpoint.load(args.resume)
+    else:
+        engine = build_engine(args.nodes, tuple(args.field), args.layout, lpwan, args.comm_range,
+                              args.seed, args.backend, args.sinks, args.multihop, args.leach,
+                              args.aggregate, args.field_length, args.weather, args.minutes_per_cycle,
+                              args.soil, args.radio, args.mac, args.channels,
+                              args.capture_db if args.capture_db >= 0 else None, args.policy,
+                              args.wake_queue, None, args.streams, args.retention, args.epoch)
+    if args.connectivity and engine.connectivity is None:
+        engine.track_connectivity()
+    start = time.perf_counter()
+    summary = engine.run(args.cycles, stop_when_depleted=not args.keep_running, fast_forward=args.fast_forward,
+                         checkpoint_every=args.checkpoint_every, checkpoint_path=args.checkpoint)
+    elapsed = time.perf_counter() - start
+    print(f"Cycles: {summary['cycles']}")
+    print(f"Simulated Time: {engine.clock.format(0)} to {engine.clock.format(summary['cycles'])}")
+    print(f"Total Data Points Collected: {summary['data_points']}")
+    print(f"Readings Delivered: {sum(summary['sink_throughput'])}")
+    print(f"Dead Nodes: {summary['dead_nodes']}/{summary['nodes']}")
+    if engine.connectivity is not None:
+        print(f"Reachable Nodes: {summary['reachable']}/{summary['nodes']}, "
+              f"Partition Events: {len(engine.connectivity.events)}")
+    if engine.channel is not None:
+        print(f"Packet Delivery Ratio: {engine.channel.delivery_ratio():.3f} "
+              f"({engine.channel.lost} of {engine.channel.sent} lost)")
+    if engine.skipped:
+        print(f"Fast-forwarded Cycles: {engine.skipped}")
+    if len(summary['sink_throughput']) > 1:
+        print(f"Per-sink Throughput: {summary['sink_throughput']}")
+    print(f"Elapsed: {elapsed:.3f}s ({summary['cycles'] / elapsed if elapsed else 0:.0f} cycles/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
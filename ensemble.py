@@ -0,0 +1,169 @@
+import os
+import sys
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from sweep import run_config, format_table, _parse_value
+
+# Student-t quantiles keyed by (confidence, degrees of freedom)
+_T_CACHE = {}
+
+def t_coverage(t, df):
+    # P(|T| <= t) for Student's t with integer df, by the finite series of Abramowitz &
+    # Stegun 26.7.3-4 (exact, no special functions needed)
+    theta = math.atan(t / math.sqrt(df))
+    c2 = math.cos(theta) ** 2
+    term = total = 1.0
+    if df % 2:
+        for k in range(1, (df - 1) // 2):
+            term *= c2 * (2 * k) / (2 * k + 1)
+            total += term
+        return 2 / math.pi * (theta + (math.sin(theta) * math.cos(theta) * total if df > 1 else 0.0))
+    for k in range(1, df // 2):
+        term *= c2 * (2 * k - 1) / (2 * k)
+        total += term
+    return math.sin(theta) * total
+
+def t_quantile(confidence, df):
+    # Two-sided critical value: P(|T| <= t) = confidence, by bisection
+    key = (confidence, df)
+    cached = _T_CACHE.get(key)
+    if cached is not None:
+        return cached
+    lo, hi = 0.0, 1.0
+    while t_coverage(hi, df) < confidence:
+        hi *= 2
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if t_coverage(mid, df) < confidence:
+            lo = mid
+        else:
+            hi = mid
+    _T_CACHE[key] = hi
+    return hi
+
+# Welford's online mean/variance: one pass, no stored samples, stable for long ensembles
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else math.inf
+
+    def half_width(self, confidence=0.95):
+        # Student-t confidence interval half-width of the mean; the normal quantile would be
+        # too narrow at the small replica counts an ensemble can stop at
+        if self.count < 2:
+            return math.inf
+        return t_quantile(confidence, self.count - 1) * math.sqrt(self.variance() / self.count)
+
+def replica_seed(seed, replica):
+    # Independent 64-bit seed per replica, spawned from the ensemble seed
+    state = np.random.SeedSequence(seed, spawn_key=(replica,)).generate_state(2, np.uint32)
+    return int(state[0]) << 32 | int(state[1])
+
+# Runs replicas of one configuration, differing only in seed, across a process pool and
+# streams each replica's metrics into RunningStats. Stops once every target metric's
+# confidence interval half-width is within its target (relative: as a fraction of the
+# mean), after at least min_replicas and at most max_replicas. Results are folded in
+# replica order, so the stopping point does not depend on which worker finishes first.
+# Metrics with no value in a replica (e.g. half_dead when half the nodes survive) are skipped.
+def run_ensemble(config, targets, confidence=0.95, relative=False, min_replicas=10, max_replicas=1000,
+                 seed=0, workers=None, log=None):
+    stats = {}
+    pending = {}
+    finished = {}
+    folded = 0
+    submitted = 0
+    workers = workers or os.cpu_count()
+
+    def converged():
+        if folded < min_replicas:
+            return False
+        for metric, target in targets.items():
+            s = stats.get(metric)
+            if s is None or s.count < 2:
+                return False
+            limit = target * abs(s.mean) if relative else target
+            if s.half_width(confidence) > limit:
+                return False
+        return True
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        done = False
+        while not done:
+            while submitted < max_replicas and len(pending) < 2 * workers:
+                future = pool.submit(run_config, dict(config, seed=replica_seed(seed, submitted)))
+                pending[future] = submitted
+                submitted += 1
+            ready, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in ready:
+                finished[pending.pop(future)] = future.result()
+            while folded in finished:
+                row = finished.pop(folded)
+                folded += 1
+                for metric, value in row.items():
+                    if isinstance(value, (int, float)):
+                        stats.setdefault(metric, RunningStats()).add(value)
+                if log is not None:
+                    log(folded, stats)
+                if converged() or folded == max_replicas:
+                    done = True
+                    break
+        # Drop the queued replicas. Ones already running can't be interrupted: the pool waits
+        # for them on exit and their results are discarded.
+        pool.shutdown(cancel_futures=True)
+    return {
+        'replicas': folded,
+        'converged': converged(),
+        'stats': stats,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seed replicas of one configuration until the confidence "
+                                                 "intervals of the target metrics are narrow enough")
+    parser.add_argument('--set', nargs='+', default=[], metavar='KEY=VALUE', help="engine setting, as in sweep.py")
+    parser.add_argument('--target', nargs='+', default=['half_dead=10'], metavar='METRIC=WIDTH',
+                        help="CI half-width to reach per metric (default: half_dead=10)")
+    parser.add_argument('--relative', action='store_true', help="target widths are fractions of the mean")
+    parser.add_argument('--confidence', type=float, default=0.95)
+    parser.add_argument('--min-replicas', type=int, default=10)
+    parser.add_argument('--max-replicas', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="ensemble seed the replica seeds are spawned from")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    config = {}
+    for item in args.set:
+        key, _, value = item.partition('=')
+        config[key] = _parse_value(value)
+    targets = {}
+    for item in args.target:
+        key, _, value = item.partition('=')
+        targets[key] = float(value)
+
+    def log(count, stats):
+        shown = ', '.join(f"{m}={stats[m].mean:.4g}±{stats[m].half_width(args.confidence):.3g}"
+                          for m in targets if m in stats)
+        print(f"[{count}] {shown}", file=sys.stderr)
+
+    result = run_ensemble(config, targets, args.confidence, args.relative, args.min_replicas, args.max_replicas,
+                          args.seed, args.workers, log)
+    rows = [{'metric': m, 'mean': f"{s.mean:.6g}", 'std': f"{math.sqrt(s.variance()):.4g}" if s.count > 1 else '',
+             'half_width': f"{s.half_width(args.confidence):.4g}", 'n': s.count}
+            for m, s in result['stats'].items()]
+    print(f"Replicas: {result['replicas']} ({'converged' if result['converged'] else 'not converged'})")
+    print(format_table(rows, ['metric', 'mean', 'std', 'half_width', 'n']))
+    return 0 if result['converged'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
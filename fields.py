@@ -0,0 +1,110 @@
+import math
+import numpy as np
+from network import DATA_TYPES, SENSE_RANGES
+
+# Spectral filters keyed by (grid shape, correlation length in cells). Building one costs
+# a full-grid exp, so they are shared by every field and timestep with the same shape.
+_FILTER_CACHE = {}
+
+def spectral_filter(shape, length_cells):
+    key = (shape, float(length_cells))
+    cached = _FILTER_CACHE.get(key)
+    if cached is not None:
+        return cached
+    ny, nx = shape
+    ky = np.fft.fftfreq(ny)[:, None]
+    kx = np.fft.fftfreq(nx)[None, :]
+    # Amplitude for a Gaussian covariance with the given correlation length
+    amplitude = np.exp(-(math.pi * length_cells) ** 2 * (kx * kx + ky * ky))
+    # Scale so the synthesized field has unit variance
+    amplitude /= math.sqrt(np.mean(amplitude * amplitude))
+    cached = np.ascontiguousarray(amplitude[:, :nx // 2 + 1])
+    _FILTER_CACHE[key] = cached
+    return cached
+
+# Periodic Gaussian random field on a grid, synthesized by filtering white noise in
+# the Fourier domain. Evolves as an AR(1) process so successive timesteps stay correlated.
+class GaussianRandomField:
+    def __init__(self, shape, length_cells, rng, persistence=0.95, out=None):
+        self.shape = shape
+        self.rng = rng
+        self.persistence = persistence
+        self.filter = spectral_filter(shape, length_cells)
+        self.grid = np.empty(shape) if out is None else out
+        self.grid[...] = self.synthesize()
+
+    def synthesize(self):
+        # Draw the white noise straight in the Fourier domain (the rfft2 of unit white noise
+        # has complex Gaussian bins of variance N), saving a forward FFT per timestep
+        half = self.filter.shape
+        scale = math.sqrt(self.shape[0] * self.shape[1] / 2)
+        spectrum = self.rng.standard_normal(half) + 1j * self.rng.standard_normal(half)
+        spectrum *= self.filter * scale
+        return np.fft.irfft2(spectrum, s=self.shape)
+
+    def advance(self, steps=1):
+        # k AR(1) steps at once: rho^k * old + sqrt(1 - rho^2k) * fresh field
+        rho = self.persistence ** steps
+        self.grid *= rho
+        self.grid += math.sqrt(1 - rho * rho) * self.synthesize()
+
+CELLS_PER_LENGTH = 8
+
+# Correlated environment: one random field per data type over the whole farm, mapped
+# onto the SENSE_RANGES of that type. Nodes read it with bilinear interpolation.
+class EnvironmentField:
+    def __init__(self, field_size, length=10.0, resolution=None, seed=None, persistence=0.95, update_interval=1):
+        # resolution is grid cells per field unit. By default the correlation length spans
+        # CELLS_PER_LENGTH cells (at most one cell per unit), which bilinear lookup resolves well.
+        if resolution is None:
+            resolution = min(1.0, CELLS_PER_LENGTH / length)
+        self.resolution = resolution
+        self.shape = (max(1, math.ceil(field_size[1] * resolution)), max(1, math.ceil(field_size[0] * resolution)))
+        self.update_interval = update_interval
+        self.cycle = 0
+        rng = np.random.default_rng(seed)
+        self.grids = np.empty((len(DATA_TYPES),) + self.shape)
+        self.fields = [GaussianRandomField(self.shape, length * resolution, rng, persistence, out=grid)
+                       for grid in self.grids]
+        self.low = np.array([SENSE_RANGES[t][0] for t in DATA_TYPES], dtype=np.float64)
+        self.high = np.array([SENSE_RANGES[t][1] for t in DATA_TYPES], dtype=np.float64)
+        # Mean at the middle of the range, +-3 sigma spanning it
+        self.mean = (self.low + self.high) / 2
+        self.std = (self.high - self.low) / 6
+
+    def __setstate__(self, state):
+        # Unpickled fields hold copies of their grids: make them views of self.grids again,
+        # which sample() reads
+        self.__dict__.update(state)
+        for field, grid in zip(self.fields, self.grids):
+            field.grid = grid
+
+    def update(self, cycle):
+        # Advance the fields to the given cycle, in update_interval-sized AR steps
+        steps = (cycle // self.update_interval) - (self.cycle // self.update_interval)
+        self.cycle = cycle
+        if steps > 0:
+            for field in self.fields:
+                field.advance(steps)
+
+    def sample(self, ids, codes, x, y):
+        # Vectorized bilinear lookup of each node's own data type at (x, y)
+        grids = self.grids
+        ny, nx = self.shape
+        gx = np.asarray(x) * self.resolution
+        gy = np.asarray(y) * self.resolution
+        i0 = np.floor(gx)
+        j0 = np.floor(gy)
+        fx = gx - i0
+        fy = gy - j0
+        i0 = i0.astype(np.int64) % nx
+        j0 = j0.astype(np.int64) % ny
+        i1 = (i0 + 1) % nx
+        j1 = (j0 + 1) % ny
+        g = (grids[codes, j0, i0] * (1 - fx) * (1 - fy) + grids[codes, j0, i1] * fx * (1 - fy)
+             + grids[codes, j1, i0] * (1 - fx) * fy + grids[codes, j1, i1] * fx * fy)
+        return np.clip(self.mean[codes] + self.std[codes] * g, self.low[codes], self.high[codes])
+
+    def value_at(self, node_id, data_type, x, y):
+        code = DATA_TYPES.index(data_type)
+        return float(self.sample(None, np.array([code]), np.array([x]), np.array([y]))[0])
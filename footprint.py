@@ -0,0 +1,37 @@
+import sys
+import argparse
+import tracemalloc
+from engine import build_nodes, ring_layout
+from network import SensorNode, LPWANSensorNode
+
+# Per-node memory benchmark: bytes allocated per node for each representation,
+# measured with tracemalloc over num_nodes nodes (positions excluded)
+def measure(build, num_nodes):
+    positions = ring_layout(num_nodes, (1000, 1000))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = build(positions)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del nodes
+    return used / num_nodes
+
+def footprint(num_nodes=100000):
+    from nodearray import NodeArray
+    nodes = build_nodes(ring_layout(num_nodes, (1000, 1000)), LPWANSensorNode)
+    return {
+        'SensorNode': measure(lambda p: build_nodes(p, SensorNode), num_nodes),
+        'LPWANSensorNode': measure(lambda p: build_nodes(p, LPWANSensorNode), num_nodes),
+        'NodeArray': measure(lambda p: NodeArray.from_nodes(nodes), num_nodes),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report the memory footprint per sensor node")
+    parser.add_argument('--nodes', type=int, default=100000)
+    args = parser.parse_args(argv)
+    for name, size in footprint(args.nodes).items():
+        print(f"{name:16} {size:8.1f} bytes/node  ({size * 1e6 / 2 ** 20:7.1f} MiB per million nodes)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
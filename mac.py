@@ -0,0 +1,82 @@
+import heapq
+import math
+import numpy as np
+from collision import AlohaChannel
+from spatial import SpatialHash
+
+# Sub-cycle event kinds. Events are keyed (time, kind, packet), so a transmission ending
+# frees the channel before an attempt at the same instant.
+TX_END = 0
+ATTEMPT = 1
+
+# Non-persistent CSMA with binary exponential backoff. Packets become ready at random
+# times in the cycle's window; each attempt senses its channel and either transmits or
+# backs off for a random number of slots, giving up after max_retries busy attempts;
+# a dropped packet never goes on air, so its sender pays nothing for it.
+# Ongoing transmissions sit in one SpatialHash per channel with cells of the sensing
+# range, so a carrier-sense check only looks at the surrounding cells. Nodes beyond
+# sense_range of each other stay hidden terminals: packets that still overlap at the
+# gateway go through the same collision sweep as ALOHA.
+class CSMAChannel(AlohaChannel):
+    def __init__(self, radio=None, window=600.0, channels=3, capture_db=6.0, seed=None, sense_range=None,
+                 slot=None, min_exponent=3, max_exponent=8, max_retries=5):
+        super().__init__(radio, window, channels, capture_db, seed)
+        # By default a node hears anything within SF7 range, and a slot is one short packet
+        self.sense_range = sense_range if sense_range is not None else self.radio.range_of(7)
+        self.slot = slot if slot is not None else self.radio.airtime[7][self.radio.reading_bytes]
+        self.min_exponent = min_exponent
+        self.max_exponent = max_exponent
+        self.max_retries = max_retries
+        self.dropped = 0  # Packets abandoned after max_retries busy channel checks
+        self.backoffs = 0
+
+    def access(self, ready, channel, x, y, airtime, draws):
+        # Run carrier sensing and backoff for one cycle's packets (plain lists; draws holds
+        # max_retries uniforms per packet). Returns each packet's start time, NaN if dropped.
+        n = len(ready)
+        start = [math.nan] * n
+        retries = [0] * n
+        on_air = [SpatialHash(self.sense_range) for _ in range(self.channels)]
+        heap = [(t, ATTEMPT, i) for i, t in enumerate(ready)]
+        heapq.heapify(heap)
+        sense_range = self.sense_range
+        while heap:
+            t, kind, i = heapq.heappop(heap)
+            busy = on_air[channel[i]]
+            if kind == TX_END:
+                busy.remove(i)
+            elif busy.any_within(x[i], y[i], sense_range):
+                retries[i] += 1
+                if retries[i] > self.max_retries:
+                    continue
+                self.backoffs += 1
+                exponent = min(self.min_exponent + retries[i] - 1, self.max_exponent)
+                wait = int(draws[i][retries[i] - 1] * (1 << exponent)) + 1
+                heapq.heappush(heap, (t + wait * self.slot, ATTEMPT, i))
+            else:
+                start[i] = t
+                busy.insert(i, x[i], y[i])
+                heapq.heappush(heap, (t + airtime[i], TX_END, i))
+        return start
+
+    def resolve(self, distance, sink, x=None, y=None, payload_scale=1.0):
+        distance = np.asarray(distance, dtype=np.float64)
+        n = len(distance)
+        sf, airtime, out_of_range = self.packets(distance, payload_scale)
+        rng = self.rng
+        ready = (rng.random(n) * np.maximum(self.window - airtime, 0.0)).tolist()
+        channel = rng.integers(self.channels, size=n)
+        # One backoff draw per possible retry, taken in bulk
+        draws = rng.random((n, self.max_retries)).tolist()
+        start = np.array(self.access(ready, channel.tolist(), np.asarray(x, dtype=np.float64).tolist(),
+                                     np.asarray(y, dtype=np.float64).tolist(), airtime.tolist(), draws))
+        self.on_air = ~np.isnan(start)
+        sent = np.flatnonzero(self.on_air)
+        lost = np.ones(n, dtype=bool)
+        sink = np.asarray(sink, dtype=np.int64)
+        lost[sent] = self.decode(start[sent], airtime[sent], channel[sent], sf[sent], sink[sent], distance[sent])
+        lost |= out_of_range
+        self.sent += n
+        self.lost += int(lost.sum())
+        self.dropped += n - len(sent)
+        return lost
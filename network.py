@@ -0,0 +1,215 @@
+import random
+import math
+
+DATA_TYPES = ['moisture', 'temperature', 'humidity', 'light', 'ph']
+
+# Uniform sensing range (low, high) per data type
+SENSE_RANGES = {
+    'moisture': (20, 80),
+    'temperature': (15, 35),
+    'humidity': (20, 80),
+    'light': (100, 1000),
+    'ph': (5.5, 7.5)
+}
+
+# Readings outside (low, high) are critical and make LPWAN nodes sample more often
+CRITICAL_THRESHOLDS = {
+    'moisture': (30, 70),  # Critical if <30% or >70%
+    'temperature': (20, 30),  # Critical if <20°C or >30°C
+    'humidity': (30, 70),  # Critical if <30% or >70%
+    'light': (200, 800),  # Critical if <200 or >800 µmol/m²/s
+    'ph': (6.0, 7.0)  # Critical if <6.0 or >7.0
+}
+
+# Sensor Node class. Slotted: no per-node __dict__, and the reading is one float in
+# value rather than a {data_type: value} dict (data builds that dict on demand).
+class SensorNode:
+    __slots__ = ('id', 'x', 'y', 'battery', 'sensing_range', 'comm_range', 'active', 'data_type', 'value',
+                 'energy_per_sense', 'energy_per_transmit', 'duty_cycle')
+
+    def __init__(self, id, x, y, data_type, battery=100.0, sensing_range=10.0, comm_range=50.0):
+        self.id = id
+        self.x = x
+        self.y = y
+        self.battery = battery
+        self.sensing_range = sensing_range
+        self.comm_range = comm_range
+        self.active = True
+        self.data_type = data_type  # 'moisture', 'temperature', 'humidity', 'light', 'ph'
+        self.value = 0.0  # Last reading of data_type
+        self.energy_per_sense = 0.05
+        self.energy_per_transmit = 0.1
+        self.duty_cycle = 1.0
+
+    @property
+    def data(self):
+        # Last reading as a dict, for display code; the engine passes data_type and value as is
+        return {self.data_type: self.value}
+
+    def sense_environment(self, rng=random, environment=None):
+        # environment: optional field model to read instead of drawing uniform noise.
+        # Returns the reading, or None when the node did not sense.
+        if not self.active or self.battery <= 0:
+            self.active = False
+            return None
+        if environment is not None:
+            self.value = environment.value_at(self.id, self.data_type, self.x, self.y)
+        else:
+            low, high = SENSE_RANGES[self.data_type]
+            self.value = rng.uniform(low, high)
+        self.battery -= self.energy_per_sense
+        if self.battery <= 0:
+            self.active = False
+        return self.value
+
+    def transmit_data(self, base_station, payload_scale=1.0):
+        # payload_scale: packet size relative to a single reading (aggregates are larger)
+        if not self.active or self.battery <= 0:
+            self.active = False
+            return False
+        dx = self.x - base_station.x
+        dy = self.y - base_station.y
+        distance = math.sqrt(dx * dx + dy * dy)  # x * x, not x**2: pow() can round differently from NumPy
+        if distance <= self.comm_range:
+            self.battery -= self.energy_per_transmit * (distance / self.comm_range) * payload_scale
+            if self.battery <= 0:
+                self.active = False
+            return True
+        return False
+
+    def reaches(self, base_station):
+        # Whether transmit_data(base_station) would send, without sending or charging anything
+        dx = self.x - base_station.x
+        dy = self.y - base_station.y
+        return self.active and self.battery > 0 and math.sqrt(dx * dx + dy * dy) <= self.comm_range
+
+    def next_wake(self, cycle):
+        # Cycle at which the node next needs to be visited by the event scheduler
+        return cycle + 1
+
+_default_policy = None
+
+def default_policy():
+    # The dutycycle.DutyCyclePolicy() that LPWAN nodes without a policy of their own follow:
+    # 20/50 battery breakpoints, doubled for critical readings. Imported on first use, since
+    # dutycycle imports this module.
+    global _default_policy
+    if _default_policy is None:
+        from dutycycle import DutyCyclePolicy
+        _default_policy = DutyCyclePolicy()
+    return _default_policy
+
+# Sensor Node class with LPWAN and adaptive duty cycle
+class LPWANSensorNode(SensorNode):
+    __slots__ = ('sleep_time', 'presampled', 'last_value', 'spreading_factor', 'airtime', 'radio', 'policy')
+
+    def __init__(self, id, x, y, data_type, battery=100.0, sensing_range=10.0, comm_range=1000.0):
+        super().__init__(id, x, y, data_type, battery, sensing_range, comm_range)
+        self.energy_per_sense = 0.02  # Reduced for LPWAN
+        self.energy_per_transmit = 0.05  # Reduced for LPWAN
+        self.duty_cycle = 1.0  # Percentage of time active (1.0 = always active)
+        self.sleep_time = 0  # Cycles to sleep
+        self.presampled = False  # Next gate already drawn by plan_sleep()
+        self.last_value = None  # For data criticality
+        self.spreading_factor = 0  # Set per packet when a radio is attached
+        self.airtime = 0.0
+        self.radio = None  # Optional link model (radio.LoRaRadio) pricing packets by airtime
+        self.policy = None  # Optional dutycycle.DutyCyclePolicy, default_policy() when None
+
+    def update_duty_cycle(self):
+        # Adjust duty cycle based on battery and data criticality
+        policy = self.policy if self.policy is not None else default_policy()
+        self.duty_cycle = policy.duty_for(self.battery, self.last_value, self.data_type)
+        if self.battery <= 0:
+            self.active = False
+
+    def sense_environment(self, rng=random, environment=None):
+        if not self.active or self.battery <= 0 or self.sleep_time > 0:
+            self.active = False if self.battery <= 0 else self.active
+            self.sleep_time -= 1 if self.sleep_time > 0 else 0
+            return None
+        if self.presampled:
+            self.presampled = False
+        elif rng.random() > self.duty_cycle:
+            self.sleep_time = 1  # Skip this cycle
+            return None
+        value = super().sense_environment(rng, environment)
+        if value is not None:
+            self.last_value = value
+            self.update_duty_cycle()
+        return value
+
+    def transmit_data(self, base_station, payload_scale=1.0):
+        if self.sleep_time > 0:
+            self.active = False if self.battery <= 0 else self.active
+            return False
+        if self.radio is None:
+            return super().transmit_data(base_station, payload_scale)
+        if not self.active or self.battery <= 0:
+            self.active = False
+            return False
+        dx = self.x - base_station.x
+        dy = self.y - base_station.y
+        packet = self.radio.packet_energy(math.sqrt(dx * dx + dy * dy), payload_scale)
+        if packet is None:
+            return False
+        self.spreading_factor, self.airtime, cost = packet
+        self.battery -= cost
+        if self.battery <= 0:
+            self.active = False
+        return True
+
+    def reaches(self, base_station):
+        if self.sleep_time > 0:
+            return False
+        if self.radio is None:
+            return super().reaches(base_station)
+        dx = self.x - base_station.x
+        dy = self.y - base_station.y
+        return self.active and self.battery > 0 and self.radio.spreading_factor(math.sqrt(dx * dx + dy * dy)) > 0
+
+    def plan_sleep(self, rng=random):
+        # Draw the whole run of gates the node will miss at its current duty cycle
+        # (geometric) and sleep through it: each miss is the missed cycle plus one asleep
+        if self.duty_cycle <= 0:
+            return
+        misses = 0 if self.duty_cycle >= 1 else int(math.log(1.0 - rng.random()) / math.log(1.0 - self.duty_cycle))
+        self.sleep_time = 2 * misses
+        self.presampled = True
+
+    def next_wake(self, cycle):
+        return cycle + 1 + self.sleep_time
+
+# Base Station class
+class BaseStation:
+    def __init__(self, x, y, retention=None):
+        from datastore import ReadingStore
+        self.x = x
+        self.y = y
+        self.collected_data = ReadingStore(retention)  # Columnar; retention caps it as a ring buffer
+        self.received = 0  # Throughput counter: readings delivered to this sink
+        self.tick = 0  # Stamped on incoming readings; the engine sets it each cycle
+
+    def receive_data(self, node_id, data, duty_cycle=None):
+        # {data_type: value} form, as node.data gives it
+        self.received += 1
+        for data_type, value in data.items():
+            self.collected_data.append(node_id, self.tick, data_type, value, duty_cycle)
+
+    def receive_reading(self, node_id, data_type, value, duty_cycle=None):
+        self.received += 1
+        self.collected_data.append(node_id, self.tick, data_type, value, duty_cycle)
+
+    def receive_many(self, node_ids, data_types, values, duty_cycles):
+        # Sequences or arrays; data_types as names or DATA_TYPES codes
+        self.received += len(node_ids)
+        self.collected_data.extend(node_ids, self.tick, data_types, values, duty_cycles)
+
+    def receive_aggregate(self, node_id, data_type, count, mean, minimum, maximum, duty_cycle=None):
+        # One packet summarising count readings of data_type combined in the network
+        self.received += count
+        self.collected_data.append(node_id, self.tick, data_type, mean, duty_cycle, count, minimum, maximum)
+
+    def receive_aggregates(self, node_ids, data_types, counts, means, minimums, maximums):
+        self.received += int(sum(counts))
+        self.collected_data.extend(node_ids, self.tick, data_types, means, None, counts, minimums, maximums)
@@ -0,0 +1,189 @@
+import numpy as np
+from network import DATA_TYPES, SENSE_RANGES
+from streams import CounterRNG
+
+TYPE_CODES = {data_type: code for code, data_type in enumerate(DATA_TYPES)}
+SENSE_LOW = np.array([SENSE_RANGES[t][0] for t in DATA_TYPES], dtype=np.float64)
+SENSE_HIGH = np.array([SENSE_RANGES[t][1] for t in DATA_TYPES], dtype=np.float64)
+
+# Struct-of-arrays node store: one contiguous NumPy column per SensorNode attribute
+class NodeArray:
+    def __init__(self, ids, x, y, data_type, battery, comm_range, energy_per_sense, energy_per_transmit):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.data_type = np.asarray(data_type, dtype=np.int8)
+        self.battery = np.array(battery, dtype=np.float64)
+        self.comm_range = np.asarray(comm_range, dtype=np.float64)
+        self.energy_per_sense = np.asarray(energy_per_sense, dtype=np.float64)
+        self.energy_per_transmit = np.asarray(energy_per_transmit, dtype=np.float64)
+        self.active = self.battery > 0
+        self.value = np.zeros(len(self.ids), dtype=np.float64)
+        self._mt = np.random.RandomState()
+        self.sink = np.zeros(len(self.ids), dtype=np.int32)
+        self.sink_distance = None
+        self._sink_positions = None
+        # Duty-cycled (LPWAN) nodes: set a dutycycle.DutyCyclePolicy to gate sensing
+        self.policy = None
+        self.duty_cycle = np.ones(len(self.ids))
+        self.last_value = np.full(len(self.ids), np.nan)
+        self.wake_at = np.zeros(len(self.ids), dtype=np.int64)  # First cycle a sleeping node senses again
+        self.wheel = None  # {cycle: [index arrays]} of parked nodes, see enable_wake_queue()
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        array = cls(
+            [node.id for node in nodes],
+            [node.x for node in nodes],
+            [node.y for node in nodes],
+            [TYPE_CODES[node.data_type] for node in nodes],
+            [node.battery for node in nodes],
+            [node.comm_range for node in nodes],
+            [node.energy_per_sense for node in nodes],
+            [node.energy_per_transmit for node in nodes],
+        )
+        array.active &= np.array([node.active for node in nodes], dtype=bool)
+        array.value[:] = [node.value for node in nodes]
+        array.duty_cycle[:] = [node.duty_cycle for node in nodes]
+        array.last_value[:] = [np.nan if getattr(node, 'last_value', None) is None else node.last_value
+                               for node in nodes]
+        array.wake_at[:] = [1 + getattr(node, 'sleep_time', 0) for node in nodes]
+        return array
+
+    def __len__(self):
+        return len(self.ids)
+
+    def sync_to(self, nodes):
+        # Write the columns back into SensorNode objects (for the GUI and summaries)
+        for i, node in enumerate(nodes):
+            node.battery = float(self.battery[i])
+            node.active = bool(self.active[i])
+            node.value = float(self.value[i])
+            node.duty_cycle = float(self.duty_cycle[i])
+            if self.policy is not None:
+                node.last_value = None if np.isnan(self.last_value[i]) else float(self.last_value[i])
+
+    def assign_sinks(self, sinks):
+        # Nearest sink per node, one (N,) pass per sink; rerun only when sinks move
+        positions = [(sink.x, sink.y) for sink in sinks]
+        best = np.full(len(self.ids), np.inf)
+        self.sink = np.zeros(len(self.ids), dtype=np.int32)
+        for s, (sx, sy) in enumerate(positions):
+            d2 = (self.x - sx) * (self.x - sx) + (self.y - sy) * (self.y - sy)
+            closer = d2 < best
+            best[closer] = d2[closer]
+            self.sink[closer] = s
+        self.sink_distance = np.sqrt(best)
+        self._sink_positions = positions
+
+    def distance_to(self, sinks):
+        if [(sink.x, sink.y) for sink in sinks] != self._sink_positions:
+            self.assign_sinks(sinks)
+        return self.sink_distance
+
+    def uniform(self, rng, n):
+        # Draw n values from rng's Mersenne Twister stream in bulk; the state is handed
+        # back afterwards so the draws are identical to n calls of rng.random()
+        version, internal, gauss = rng.getstate()
+        self._mt.set_state(('MT19937', np.array(internal[:-1], dtype=np.uint32), internal[-1]))
+        u = self._mt.random_sample(n)
+        _, key, pos = self._mt.get_state()[:3]
+        rng.setstate((version, tuple(key.tolist()) + (int(pos),), gauss))
+        return u
+
+    def draws(self, rng, nodes, cycle, purpose, draw=0):
+        # One uniform per node index: from each node's own stream when rng is a
+        # streams.CounterRNG, else the next len(nodes) values of the shared stream
+        if isinstance(rng, CounterRNG):
+            return rng.uniforms(purpose, cycle, self.ids[nodes], draw)
+        return self.uniform(rng, len(nodes))
+
+    def enable_wake_queue(self, rng, cycle=0):
+        # Park every live node until its first sensing cycle; from then on a cycle only
+        # touches the nodes whose bucket comes due
+        self.wheel = {}
+        self._park(np.flatnonzero(self.active), rng, cycle)
+
+    def _park(self, nodes, rng, cycle):
+        # LPWANSensorNode.plan_sleep() for a batch: misses ~ geometric(duty cycle), two cycles each
+        if len(nodes) == 0:
+            return
+        duty = self.duty_cycle[nodes]
+        misses = np.zeros(len(nodes), dtype=np.int64)
+        part = duty < 1  # Always-on nodes draw nothing
+        u = self.draws(rng, nodes[part], cycle, 'sleep')
+        misses[part] = np.floor(np.log(1.0 - u) / np.log(1.0 - duty[part]))
+        wake = cycle + 1 + 2 * misses
+        self.wake_at[nodes] = wake
+        order = np.argsort(wake, kind='stable')
+        wake = wake[order]
+        starts = np.flatnonzero(np.concatenate(([True], wake[1:] != wake[:-1])))
+        for group, at in zip(np.split(nodes[order], starts[1:]), wake[starts].tolist()):
+            self.wheel.setdefault(at, []).append(group)
+
+    def sense(self, rng, environment=None, cycle=0):
+        # Vectorized sense_environment for every live node. Returns the sensed indices.
+        if self.wheel is not None:
+            due = self.wheel.pop(cycle, None)
+            sensed = np.sort(np.concatenate(due)) if due else np.empty(0, dtype=np.int64)
+            sensed = sensed[self.active[sensed]]
+        else:
+            sensed = np.flatnonzero(self.active)
+        if self.policy is not None and self.wheel is None:
+            # Awake nodes draw against their duty cycle; a miss sleeps through the next cycle
+            sensed = sensed[self.wake_at[sensed] <= cycle]
+            asleep = self.policy.sleep_mask(self.duty_cycle[sensed], self.draws(rng, sensed, cycle, 'sense'))
+            self.wake_at[sensed[asleep]] = cycle + 2
+            sensed = sensed[~asleep]
+            draw = 1
+        else:
+            draw = 0
+        codes = self.data_type[sensed]
+        if environment is not None:
+            self.value[sensed] = environment.sample(self.ids[sensed], codes, self.x[sensed], self.y[sensed])
+        else:
+            low = SENSE_LOW[codes]
+            self.value[sensed] = low + (SENSE_HIGH[codes] - low) * self.draws(rng, sensed, cycle, 'sense', draw)
+        self.battery[sensed] -= self.energy_per_sense[sensed]
+        self.active[sensed] = self.battery[sensed] > 0
+        if self.policy is not None:
+            self.last_value[sensed] = self.value[sensed]
+            self.duty_cycle[sensed] = self.policy.evaluate(self.battery[sensed], self.value[sensed], codes)[0]
+        return sensed
+
+    def park(self, sensed, rng, cycle):
+        # After this cycle's transmissions: park the surviving sensed nodes again
+        if self.wheel is not None:
+            self._park(sensed[self.active[sensed]], rng, cycle)
+
+    def transmit(self, senders, distance):
+        # Charge energy_per_transmit * distance / comm_range to each sender that is still
+        # alive and within range of its target. Returns the indices that got through.
+        ok = self.active[senders] & (distance <= self.comm_range[senders])
+        tx = senders[ok]
+        self.battery[tx] -= self.energy_per_transmit[tx] * (distance[ok] / self.comm_range[tx])
+        self.active[tx] = self.battery[tx] > 0
+        return tx
+
+    def steady_drain(self, sinks, cycle):
+        # For fast-forwarding: (live, cost, floor, delivering) where every live node senses and
+        # transmits each cycle for a fixed battery cost until its battery falls to floor (0, or
+        # the end of its duty-cycle band). None while any live node is duty-cycled below 1 or asleep.
+        live = np.flatnonzero(self.active)
+        floor = np.zeros(len(live))
+        if self.policy is not None:
+            level, floor = self.policy.bands(self.battery[live])
+            if (level < 1.0).any() or (self.duty_cycle[live] < 1.0).any() or (self.wake_at[live] > cycle + 1).any():
+                return None
+        distance = self.distance_to(sinks)[live]
+        reach = self.comm_range[live]
+        delivering = distance <= reach
+        transmit = np.where(delivering, self.energy_per_transmit[live] * (distance / reach), 0.0)
+        return live, self.energy_per_sense[live] + transmit, floor, delivering
+
+    def step(self, rng, sinks, environment=None, cycle=0):
+        # Vectorized equivalent of sense_environment + transmit_data to each node's
+        # nearest sink. Returns (sensed, delivered) index arrays.
+        sensed = self.sense(rng, environment, cycle)
+        distance = self.distance_to(sinks)
+        return sensed, self.transmit(sensed, distance[sensed])
@@ -0,0 +1,96 @@
+import math
+import numpy as np
+from aggregation import HEADER_BYTES, READING_BYTES
+
+SPREADING_FACTORS = (7, 8, 9, 10, 11, 12)
+# Receiver sensitivity in dBm at 125 kHz (SX1276 datasheet)
+SENSITIVITY = {7: -123.0, 8: -126.0, 9: -129.0, 10: -132.0, 11: -134.5, 12: -137.0}
+
+def time_on_air(sf, payload_bytes, bandwidth=125e3, coding_rate=1, preamble=8, crc=True, explicit_header=True):
+    # LoRa packet airtime in seconds (Semtech AN1200.13)
+    symbol = (1 << sf) / bandwidth
+    low_rate = symbol > 0.016  # Low data rate optimisation, mandatory above 16 ms symbols
+    bits = 8 * payload_bytes - 4 * sf + 28 + 16 * crc - 20 * (not explicit_header)
+    symbols = 8 + max(math.ceil(bits / (4 * (sf - 2 * low_rate))) * (coding_rate + 4), 0)
+    return (preamble + 4.25 + symbols) * symbol
+
+# LoRa-style LPWAN link model. Log-distance path loss sets the received power, each link
+# gets the fastest spreading factor that still closes the budget, and transmit energy is
+# the radio's TX power draw times the packet's airtime. Both the spreading factor per
+# distance bin and the energy per (SF, payload size) are tabulated up front, so pricing a
+# packet is two list lookups. Distances are in field units, taken as metres.
+class LoRaRadio:
+    def __init__(self, tx_power=14.0, frequency=868e6, path_loss_exponent=2.9, reference_distance=1.0,
+                 margin=10.0, bandwidth=125e3, coding_rate=1, tx_current=0.044, voltage=3.3,
+                 joules_per_unit=280.8, resolution=1.0, max_payload=255):
+        # joules_per_unit converts to battery units: 100 units ~ two 2600 mAh AA cells at 3 V
+        self.tx_power = tx_power
+        self.path_loss_exponent = path_loss_exponent
+        self.reference_distance = reference_distance
+        self.margin = margin
+        self.resolution = resolution
+        self.reading_bytes = HEADER_BYTES + READING_BYTES
+        # Free-space loss at the reference distance
+        self.reference_loss = 20 * math.log10(reference_distance) + 20 * math.log10(frequency) - 147.55
+        self.max_range = self.range_of(SPREADING_FACTORS[-1])
+        # Each step up in SF roughly doubles airtime for about a quarter more range, so a
+        # chain of SF7 hops is the cheapest way across: relays go no further than that
+        self.relay_range = self.range_of(SPREADING_FACTORS[0])
+        # sf_table[bin]: slowest-needed SF for distances up to bin * resolution
+        bins = int(math.ceil(self.max_range / resolution)) + 1
+        edges = np.arange(bins) * resolution
+        budget = tx_power - self.path_loss(edges) - margin
+        sf = np.full(bins, SPREADING_FACTORS[-1], dtype=np.int8)
+        for s in reversed(SPREADING_FACTORS):
+            sf[budget >= SENSITIVITY[s]] = s
+        sf[budget < SENSITIVITY[SPREADING_FACTORS[-1]]] = 0
+        self.sf_array = sf
+        self.sf_table = sf.tolist()
+        # airtime[sf][bytes] in seconds and energy[sf][bytes] in battery units
+        power = tx_current * voltage
+        self.airtime = {s: [time_on_air(s, n, bandwidth, coding_rate) for n in range(max_payload + 1)]
+                        for s in SPREADING_FACTORS}
+        self.energy = {s: [t * power / joules_per_unit for t in times] for s, times in self.airtime.items()}
+        self.airtime_array = np.zeros((SPREADING_FACTORS[-1] + 1, max_payload + 1))
+        self.energy_array = np.zeros((SPREADING_FACTORS[-1] + 1, max_payload + 1))
+        for s in SPREADING_FACTORS:
+            self.airtime_array[s] = self.airtime[s]
+            self.energy_array[s] = self.energy[s]
+
+    def path_loss(self, distance):
+        d = np.maximum(distance, self.reference_distance)
+        return self.reference_loss + 10 * self.path_loss_exponent * np.log10(d / self.reference_distance)
+
+    def range_of(self, sf):
+        # Longest distance at which sf still closes the link budget
+        slack = self.tx_power - self.margin - SENSITIVITY[sf] - self.reference_loss
+        return self.reference_distance * 10 ** (slack / (10 * self.path_loss_exponent))
+
+    def payload_bytes(self, payload_scale=1.0):
+        return int(round(payload_scale * self.reading_bytes))
+
+    def spreading_factor(self, distance):
+        # 0 when no spreading factor reaches
+        b = math.ceil(distance / self.resolution)
+        return self.sf_table[b] if b < len(self.sf_table) else 0
+
+    def packet_energy(self, distance, payload_scale=1.0):
+        # (sf, airtime, battery units) for one packet, or None when out of range
+        sf = self.spreading_factor(distance)
+        if not sf:
+            return None
+        n = self.payload_bytes(payload_scale)
+        return sf, self.airtime[sf][n], self.energy[sf][n]
+
+    def spreading_factors(self, distance):
+        # Vectorized spreading_factor()
+        b = np.ceil(np.asarray(distance) / self.resolution).astype(np.int64)
+        out = np.zeros(len(b), dtype=np.int8)
+        ok = b < len(self.sf_array)
+        out[ok] = self.sf_array[b[ok]]
+        return out
+
+    def energies(self, sf, payload_scale=1.0):
+        # Battery units per packet for an array of spreading factors (0 -> 0)
+        return self.energy_array[sf, self.payload_bytes(payload_scale)]
+
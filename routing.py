@@ -0,0 +1,138 @@
+import heapq
+import math
+
+# Minimum-energy multi-hop routing toward the nearest (cheapest) sink.
+# parent[i] is node i's next hop: a node index >= 0, a sink encoded as -(sink + 1),
+# or None when no live route exists. Costs use the transmit energy model,
+# energy_per_transmit * distance / comm_range, or the airtime energy of nodes with a
+# radio, summed over every hop. hop_range caps node-to-node hops (default: comm_range).
+class Router:
+    def __init__(self, nodes, sinks, index, hop_range=None):
+        self.nodes = nodes
+        self.sinks = sinks
+        self.index = index  # SpatialHash of live nodes, keyed by node index
+        self.max_range = max((node.comm_range for node in nodes), default=0.0)
+        self.hop_range = self.max_range if hop_range is None else min(hop_range, self.max_range)
+        n = len(nodes)
+        self.cost = [math.inf] * n
+        self.parent = [None] * n
+        self.children = [set() for _ in range(n)]
+        self.direct = [(math.inf, None)] * n  # Cheapest single hop straight to a sink
+        self.build()
+
+    def hop_cost(self, i, x, y):
+        node = self.nodes[i]
+        dx = node.x - x
+        dy = node.y - y
+        distance = math.sqrt(dx * dx + dy * dy)
+        radio = getattr(node, 'radio', None)
+        if radio is not None:
+            # Airtime energy at the spreading factor the hop needs
+            packet = radio.packet_energy(distance, 1.0)
+            return math.inf if packet is None else packet[2]
+        if distance > node.comm_range:
+            return math.inf
+        return node.energy_per_transmit * (distance / node.comm_range)
+
+    def build(self):
+        # Full multi-source Dijkstra from every sink over the reversed neighbor graph
+        for i in range(len(self.nodes)):
+            self._set_parent(i, None)
+            self.cost[i] = math.inf
+            self.direct[i] = (math.inf, None)
+        heap = []
+        for s, sink in enumerate(self.sinks):
+            for i in self.index.neighbors(sink.x, sink.y, self.max_range):
+                c = self.hop_cost(i, sink.x, sink.y)
+                if c < self.direct[i][0]:
+                    self.direct[i] = (c, -(s + 1))
+        for i in self.index.positions:
+            c, hop = self.direct[i]
+            if hop is not None:
+                self.cost[i] = c
+                heapq.heappush(heap, (c, i, hop))
+        self._dijkstra(heap, None)
+
+    def _dijkstra(self, heap, allowed):
+        # Settle nodes in cost order; when allowed is given, only those nodes may change
+        settled = set()
+        nodes = self.nodes
+        while heap:
+            c, i, hop = heapq.heappop(heap)
+            if i in settled or c > self.cost[i]:
+                continue
+            settled.add(i)
+            self.cost[i] = c
+            self._set_parent(i, hop)
+            vx, vy = nodes[i].x, nodes[i].y
+            for j in self.index.neighbors(vx, vy, self.hop_range, exclude=i):
+                if j in settled or (allowed is not None and j not in allowed):
+                    continue
+                cj = c + self.hop_cost(j, vx, vy)
+                if cj < self.cost[j]:
+                    self.cost[j] = cj
+                    heapq.heappush(heap, (cj, j, i))
+
+    def _set_parent(self, i, hop):
+        old = self.parent[i]
+        if old is not None and old >= 0:
+            self.children[old].discard(i)
+        self.parent[i] = hop
+        if hop is not None and hop >= 0:
+            self.children[hop].add(i)
+
+    def subtree(self, i):
+        found = []
+        stack = list(self.children[i])
+        while stack:
+            j = stack.pop()
+            found.append(j)
+            stack.extend(self.children[j])
+        return found
+
+    def remove(self, i):
+        # Node i died: only the nodes routed through it are re-routed. Every other node's
+        # path avoids i, so its cost cannot change. Returns the re-routed node indices.
+        if i in self.index:
+            self.index.remove(i)
+        affected = self.subtree(i)
+        self._set_parent(i, None)
+        self.cost[i] = math.inf
+        if not affected:
+            return affected
+        affected_set = set(affected)
+        for j in affected:
+            self.cost[j] = math.inf
+        heap = []
+        nodes = self.nodes
+        for j in affected:
+            node = nodes[j]
+            best, hop = self.direct[j]
+            for k in self.index.neighbors(node.x, node.y, min(node.comm_range, self.hop_range), exclude=j):
+                if k in affected_set:
+                    continue
+                c = self.cost[k] + self.hop_cost(j, nodes[k].x, nodes[k].y)
+                if c < best:
+                    best, hop = c, k
+            if hop is not None:
+                self.cost[j] = best
+                heapq.heappush(heap, (best, j, hop))
+        self._dijkstra(heap, affected_set)
+        for j in affected:
+            if self.cost[j] == math.inf:
+                self._set_parent(j, None)
+        return affected
+
+    def route(self, i):
+        # Hops from node i to its sink: a list of node indices ending with an encoded sink
+        path = []
+        hop = self.parent[i]
+        while hop is not None:
+            path.append(hop)
+            if hop < 0:
+                return path
+            hop = self.parent[hop]
+        return None
+
+    def sink_of(self, hop):
+        return self.sinks[-hop - 1]
@@ -0,0 +1,31 @@
+import heapq
+
+# Event kinds, in the order they run when they share a timestamp and node
+WAKE = 0
+SENSE = 1
+TRANSMIT = 2
+DEATH = 3
+
+# Discrete-event kernel: a heap of (time, node_index, kind) entries. Nodes are only
+# touched when one of their events comes due, so sleeping nodes cost nothing.
+class EventQueue:
+    def __init__(self):
+        self._heap = []
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, time, node_index, kind):
+        heapq.heappush(self._heap, (time, node_index, kind))
+
+    def next_time(self):
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, time):
+        # Yield every event with timestamp <= time, including ones scheduled while iterating
+        heap = self._heap
+        while heap and heap[0][0] <= time:
+            yield heapq.heappop(heap)
+
+    def clear(self):
+        self._heap.clear()
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+DEFAULT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Simulated time: tick n (the engine's cycle n) is epoch + n * tick_seconds. Readings carry
+# integer ticks and are only turned into strings when read out. format() caches a string
+# per tick; for the default format a miss costs no strftime either, since the date part is
+# formatted once per simulated day and the time of day is plain arithmetic.
+class SimClock:
+    def __init__(self, tick_seconds=600, epoch=datetime(2025, 6, 21), fmt=DEFAULT_FORMAT, cache_size=4096):
+        # The default epoch is midsummer, the same day weather.WeatherModel starts on
+        if tick_seconds <= 0:
+            raise ValueError("tick_seconds must be positive")
+        self.tick_seconds = tick_seconds
+        self.epoch = epoch
+        self.fmt = fmt
+        self.cache_size = cache_size
+        self._midnight = datetime(epoch.year, epoch.month, epoch.day, tzinfo=epoch.tzinfo)
+        self._offset = epoch - self._midnight  # Epoch's time into its day
+        self._dates = {}  # Day index from the epoch's midnight -> "YYYY-MM-DD "
+        self._cache = {}
+
+    def seconds(self, tick):
+        return tick * self.tick_seconds
+
+    def time_of(self, tick):
+        return self.epoch + timedelta(seconds=tick * self.tick_seconds)
+
+    def tick_of(self, when):
+        # Last tick at or before a datetime
+        return int((when - self.epoch).total_seconds() // self.tick_seconds)
+
+    def format(self, tick):
+        text = self._cache.get(tick)
+        if text is not None:
+            return text
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        if self.fmt == DEFAULT_FORMAT:
+            # Same timedelta rounding as time_of(); days and seconds come out floored
+            delta = self._offset + timedelta(seconds=tick * self.tick_seconds)
+            day, second = delta.days, delta.seconds
+            date = self._dates.get(day)
+            if date is None:
+                date = (self._midnight + timedelta(days=day)).strftime("%Y-%m-%d ")
+                self._dates[day] = date
+            hour, second = divmod(second, 3600)
+            minute, second = divmod(second, 60)
+            text = f"{date}{hour:02d}:{minute:02d}:{second:02d}"
+        else:
+            text = self.time_of(tick).strftime(self.fmt)
+        self._cache[tick] = text
+        return text
+
+    def day_of_year(self, tick):
+        # Fractional day of the year (1.0 = 1 January, midnight), as weather.WeatherModel counts
+        when = self.time_of(tick)
+        midnight = datetime(when.year, when.month, when.day, tzinfo=when.tzinfo)
+        return when.timetuple().tm_yday + (when - midnight).total_seconds() / 86400
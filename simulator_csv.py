@@ -1,74 +1,13 @@
 import sys
-import random
 import math
 import csv
-from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QPushButton, 
                             QDialog, QTextEdit, QDialogButtonBox, QLabel)
 from PyQt6.QtGui import (QPainter, QColor, QPen, QFont, QImage, QBrush, QRadialGradient, 
                         QLinearGradient, QPainterPath, QPolygonF)
 from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QPointF, QRectF
-
-# Sensor Node class
-class SensorNode:
-    def __init__(self, id, x, y, data_type, battery=100.0, sensing_range=10.0, comm_range=50.0):
-        self.id = id
-        self.x = x
-        self.y = y
-        self.battery = battery
-        self.sensing_range = sensing_range
-        self.comm_range = comm_range
-        self.active = True
-        self.data_type = data_type  # 'moisture', 'temperature', 'humidity', 'light', 'ph'
-        self.data = {self.data_type: 0.0}
-        self.energy_per_sense = 0.05
-        self.energy_per_transmit = 0.1
-
-    def sense_environment(self):
-        if not self.active or self.battery <= 0:
-            self.active = False
-            return None
-        if self.data_type == 'moisture':
-            self.data['moisture'] = random.uniform(20, 80)
-        elif self.data_type == 'temperature':
-            self.data['temperature'] = random.uniform(15, 35)
-        elif self.data_type == 'humidity':
-            self.data['humidity'] = random.uniform(20, 80)
-        elif self.data_type == 'light':
-            self.data['light'] = random.uniform(100, 1000)
-        elif self.data_type == 'ph':
-            self.data['ph'] = random.uniform(5.5, 7.5)
-        self.battery -= self.energy_per_sense
-        if self.battery <= 0:
-            self.active = False
-        return self.data
-
-    def transmit_data(self, base_station):
-        if not self.active or self.battery <= 0:
-            self.active = False
-            return False
-        distance = math.sqrt((self.x - base_station.x)**2 + (self.y - base_station.y)**2)
-        if distance <= self.comm_range:
-            self.battery -= self.energy_per_transmit * (distance / self.comm_range)
-            if self.battery <= 0:
-                self.active = False
-            return True
-        return False
-
-# Base Station class
-class BaseStation:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.collected_data = []
-
-    def receive_data(self, node_id, data):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        self.collected_data.append({
-            'node_id': node_id,
-            'timestamp': timestamp,
-            'data': data
-        })
+from network import SensorNode, BaseStation
+from engine import Engine
 
 # Field Canvas for visualizing nodes, base station, transmissions, and data
 class FieldCanvas(QWidget):
@@ -252,6 +191,7 @@ class WSNMainWindow(QMainWindow):
         self.nodes = []
         self.base_station = BaseStation(self.field_size[0] / 2, self.field_size[1] / 2)
         self.setup_nodes()
+        self.engine = Engine(self.nodes, self.base_station)
         self.cycle = 0
         self.max_cycles = 5
 
@@ -347,17 +287,12 @@ class WSNMainWindow(QMainWindow):
         active_nodes = 0
         self.status_label.setText(f"Cycle {self.cycle}/{self.max_cycles}")
         
-        for node in self.nodes:
-            if not node.active:
-                continue
-            data = node.sense_environment()
-            if data:
-                active_nodes += 1
-                if node.transmit_data(self.base_station):
-                    self.base_station.receive_data(node.id, data)
-                    self.canvas.add_transmission_and_data(node.x, node.y, node.id, data, node.battery, node.data_type)
-                else:
-                    self.status_label.setText(f"Node {node.id} failed to transmit")
+        for node, data, delivered in self.engine.step():
+            active_nodes += 1
+            if delivered:
+                self.canvas.add_transmission_and_data(node.x, node.y, node.id, data, node.battery, node.data_type)
+            else:
+                self.status_label.setText(f"Node {node.id} failed to transmit")
         
         self.canvas.update()
         
@@ -401,12 +336,12 @@ class WSNMainWindow(QMainWindow):
             border: none;
         """)
         summary_text = (
-            f"Total Data Points Collected: {len(self.base_station.collected_data)}\n"
+            f"Total Data Points Collected: {self.base_station.collected_data.total}\n"
             f"Dead Nodes: {sum(1 for node in self.nodes if not node.active)}/{len(self.nodes)}\n"
             f"Data saved to 'wsn_data.csv'\n\n"
             "Last 5 Data Points:\n"
         )
-        for data in self.base_station.collected_data[-5:]:
+        for data in self.base_station.collected_data.last(5):
             data_type = list(data['data'].keys())[0]
             value = list(data['data'].values())[0]
             unit = '%' if data_type in ['moisture', 'humidity'] else 'µmol/m²/s' if data_type == 'light' else '°C' if data_type == 'temperature' else ''
@@ -0,0 +1,125 @@
+import math
+import numpy as np
+from network import DATA_TYPES
+from fields import GaussianRandomField
+
+MOISTURE = DATA_TYPES.index('moisture')
+
+# Soil-moisture grid over the farm: lateral diffusion, evaporation that speeds up with
+# temperature, rain and irrigation sources. Stepped with an explicit 5-point stencil on a
+# float32 grid, with no-flux edges: the neighbour sum comes from shifts of the flattened
+# grid into one scratch buffer, and every update is in place. Moisture nodes read it with
+# bilinear lookup; every other data type comes from the base model (a WeatherModel),
+# which also supplies the air temperature and rain for each cycle.
+class SoilMoistureGrid:
+    def __init__(self, field_size, base, resolution=1.0, diffusivity=0.001, evaporation=1 / (3 * 1440),
+                 wilting_point=15.0, field_capacity=80.0, length=20.0, seed=None):
+        # diffusivity in field units^2 per minute, evaporation as a fraction of the water
+        # above the wilting point lost per minute at 20 C (roughly doubling every 12 C)
+        self.base = base
+        self.resolution = resolution
+        # At least 2x2 cells, which the stencil's edge handling assumes
+        self.shape = (max(2, math.ceil(field_size[1] * resolution)), max(2, math.ceil(field_size[0] * resolution)))
+        self.diffusivity = diffusivity
+        self.evaporation = evaporation
+        self.wilting_point = wilting_point
+        self.field_capacity = field_capacity
+        self.cycle = 0
+        rng = np.random.default_rng(seed)
+        length_cells = max(length * resolution, 1.0)
+        # Patchy starting moisture, infiltration and microclimate (warmer patches dry faster)
+        noise = GaussianRandomField(self.shape, length_cells, rng).grid
+        self.grid = np.clip(45.0 + 8.0 * noise, wilting_point, field_capacity).astype(np.float32)
+        noise = GaussianRandomField(self.shape, length_cells, rng).grid
+        self.infiltration = np.clip(0.85 + 0.1 * noise, 0.5, 1.0).astype(np.float32)
+        noise = GaussianRandomField(self.shape, length_cells, rng).grid
+        self.temperature_offset = noise.astype(np.float32)
+        self.evaporation_grid = np.exp(0.06 * self.temperature_offset).astype(np.float32)
+        self.irrigation = None  # Moisture added per minute, per cell
+        self._scratch = np.empty(self.shape, dtype=np.float32)
+
+    def irrigate(self, x, y, radius, rate):
+        # Add a circular irrigation source of `rate` moisture per minute
+        if self.irrigation is None:
+            self.irrigation = np.zeros(self.shape, dtype=np.float32)
+        ny, nx = self.shape
+        cy = (np.arange(ny) + 0.5) / self.resolution - y
+        cx = (np.arange(nx) + 0.5) / self.resolution - x
+        self.irrigation[(cy * cy)[:, None] + (cx * cx)[None, :] <= radius * radius] += rate
+
+    def advance(self, minutes, air_temperature, rain=0.0):
+        m = self.grid
+        s = self._scratch
+        # Explicit diffusion is stable for D dt / dx^2 <= 1/4; substep when it isn't
+        alpha = self.diffusivity * minutes * self.resolution * self.resolution
+        substeps = max(1, math.ceil(alpha / 0.2))
+        alpha = np.float32(alpha / substeps)
+        if alpha > 0:
+            f = m.reshape(-1)
+            g = s.reshape(-1)
+            nx = self.shape[1]
+            for _ in range(substeps):
+                # Sum of the four neighbours from shifts of the flattened grid (contiguous, so
+                # much cheaper than column slices); the side columns, which pick up the
+                # neighbouring row, and the top/bottom rows are patched with mirrored values
+                np.add(f[:-2], f[2:], out=g[1:-1])
+                s[:, 0] = m[:, 0] + m[:, 1]
+                s[:, -1] = m[:, -2] + m[:, -1]
+                g[nx:] += f[:-nx]
+                g[:-nx] += f[nx:]
+                s[0] += m[0]
+                s[-1] += m[-1]
+                s *= alpha
+                m *= 1 - 4 * alpha
+                m += s
+        rate = self.evaporation * minutes * math.exp(0.06 * (air_temperature - 20.0))
+        if rate > 0:
+            np.subtract(m, np.float32(self.wilting_point), out=s)
+            s *= self.evaporation_grid
+            s *= np.float32(min(rate, 1.0))
+            m -= s
+        if self.irrigation is not None:
+            np.multiply(self.irrigation, np.float32(minutes), out=s)
+            m += s
+        if rain > 0:
+            np.multiply(self.infiltration, np.float32(rain), out=s)
+            m += s
+        # Anything above field capacity drains away
+        np.minimum(m, np.float32(self.field_capacity), out=m)
+
+    def update(self, cycle):
+        # Step once per cycle, including cycles the engine skipped over
+        base = self.base
+        for c in range(self.cycle + 1, cycle + 1):
+            base.update(c)
+            row = c - base.table_start
+            self.advance(base.minutes_per_cycle, base.air[row], base.rain[row])
+        self.cycle = cycle
+        base.update(cycle)
+
+    def moisture(self, x, y):
+        # Bilinear lookup between cell centres, clamped at the edges
+        ny, nx = self.shape
+        gx = np.clip(np.asarray(x, dtype=np.float64) * self.resolution - 0.5, 0, nx - 1)
+        gy = np.clip(np.asarray(y, dtype=np.float64) * self.resolution - 0.5, 0, ny - 1)
+        i0 = np.minimum(gx.astype(np.int64), max(nx - 2, 0))
+        j0 = np.minimum(gy.astype(np.int64), max(ny - 2, 0))
+        i1 = np.minimum(i0 + 1, nx - 1)
+        j1 = np.minimum(j0 + 1, ny - 1)
+        fx = gx - i0
+        fy = gy - j0
+        m = self.grid
+        return (m[j0, i0] * (1 - fx) * (1 - fy) + m[j0, i1] * fx * (1 - fy)
+                + m[j1, i0] * (1 - fx) * fy + m[j1, i1] * fx * fy)
+
+    def sample(self, ids, codes, x, y):
+        values = self.base.sample(ids, codes, x, y)
+        wet = np.flatnonzero(codes == MOISTURE)
+        if len(wet):
+            values[wet] = self.moisture(np.asarray(x)[wet], np.asarray(y)[wet])
+        return values
+
+    def value_at(self, node_id, data_type, x, y):
+        if data_type == 'moisture':
+            return float(self.moisture(x, y))
+        return self.base.value_at(node_id, data_type, x, y)
@@ -0,0 +1,151 @@
+import math
+
+# Uniform-grid spatial hash. Cells are comm_range wide, so "everything within range"
+# only ever looks at the 3x3 block of cells around a point.
+class SpatialHash:
+    def __init__(self, cell_size):
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.cells = {}
+        self.positions = {}
+
+    @classmethod
+    def from_nodes(cls, nodes, cell_size=None):
+        # Nodes are keyed by their index in the list; dead nodes are left out
+        if cell_size is None:
+            cell_size = max((node.comm_range for node in nodes), default=1.0)
+        index = cls(cell_size)
+        for i, node in enumerate(nodes):
+            if node.active:
+                index.insert(i, node.x, node.y)
+        return index
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def cell_of(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, key, x, y):
+        if key in self.positions:
+            self.remove(key)
+        self.positions[key] = (x, y)
+        self.cells.setdefault(self.cell_of(x, y), set()).add(key)
+
+    def remove(self, key):
+        x, y = self.positions.pop(key)
+        cell = self.cell_of(x, y)
+        members = self.cells[cell]
+        members.discard(key)
+        if not members:
+            del self.cells[cell]
+
+    def move(self, key, x, y):
+        old_cell = self.cell_of(*self.positions[key])
+        new_cell = self.cell_of(x, y)
+        self.positions[key] = (x, y)
+        if old_cell != new_cell:
+            members = self.cells[old_cell]
+            members.discard(key)
+            if not members:
+                del self.cells[old_cell]
+            self.cells.setdefault(new_cell, set()).add(key)
+
+    def neighbors(self, x, y, radius, exclude=None):
+        # Keys within radius of (x, y); compares squared distances, no sqrt per candidate
+        reach = math.ceil(radius / self.cell_size)
+        cx, cy = self.cell_of(x, y)
+        r2 = radius * radius
+        found = []
+        cells = self.cells
+        positions = self.positions
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                members = cells.get((i, j))
+                if not members:
+                    continue
+                for key in members:
+                    px, py = positions[key]
+                    if (px - x) * (px - x) + (py - y) * (py - y) <= r2 and key != exclude:
+                        found.append(key)
+        return found
+
+    def any_within(self, x, y, radius):
+        # neighbors() that stops at the first hit
+        reach = math.ceil(radius / self.cell_size)
+        cx, cy = self.cell_of(x, y)
+        r2 = radius * radius
+        cells = self.cells
+        positions = self.positions
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                for key in cells.get((i, j), ()):
+                    px, py = positions[key]
+                    if (px - x) * (px - x) + (py - y) * (py - y) <= r2:
+                        return True
+        return False
+
+    def node_neighbors(self, nodes, key):
+        # Live nodes within nodes[key]'s comm_range
+        node = nodes[key]
+        return self.neighbors(node.x, node.y, node.comm_range, exclude=key)
+
+    def in_rect(self, x0, y0, x1, y1):
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        cx0, cy0 = self.cell_of(x0, y0)
+        cx1, cy1 = self.cell_of(x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            # Rectangle spans more cells than are occupied; walk the occupied ones
+            cells = [members for (i, j), members in self.cells.items() if cx0 <= i <= cx1 and cy0 <= j <= cy1]
+        else:
+            cells = [self.cells[(i, j)] for i in range(cx0, cx1 + 1) for j in range(cy0, cy1 + 1)
+                     if (i, j) in self.cells]
+        found = []
+        for members in cells:
+            for key in members:
+                px, py = self.positions[key]
+                if x0 <= px <= x1 and y0 <= py <= y1:
+                    found.append(key)
+        return found
+
+# Static 2-d KD-tree over a small point set such as gateway positions
+class KDTree:
+    def __init__(self, points):
+        self.points = [(float(x), float(y)) for x, y in points]
+        self.root = self._build(list(range(len(self.points))), 0)
+
+    def _build(self, indices, axis):
+        if not indices:
+            return None
+        indices.sort(key=lambda i: self.points[i][axis])
+        mid = len(indices) // 2
+        return (indices[mid], axis,
+                self._build(indices[:mid], 1 - axis),
+                self._build(indices[mid + 1:], 1 - axis))
+
+    def nearest(self, x, y):
+        # (index, squared distance) of the closest point, or (None, inf) for an empty tree
+        best = [None, math.inf]
+        query = (x, y)
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            index, axis, left, right = node
+            px, py = self.points[index]
+            d2 = (px - x) * (px - x) + (py - y) * (py - y)
+            if d2 < best[1] or (d2 == best[1] and index < best[0]):
+                best[0], best[1] = index, d2
+            diff = query[axis] - self.points[index][axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Visit the near side first; the far side only if the splitting line is closer than the best hit
+            if diff * diff <= best[1]:
+                stack.append(far)
+            stack.append(near)
+        return best[0], best[1]
@@ -0,0 +1,78 @@
+import numpy as np
+
+# Draw purposes, each (node, cycle, purpose) is its own stream:
+# 'sense': duty-cycle gate, then the reading; 'sleep': run of missed gates for the wake
+# queue; 'elect': LEACH cluster-head election (cycle = round)
+PURPOSES = {'sense': 0, 'sleep': 1, 'elect': 2}
+
+MASK = 0xFFFFFFFF
+M0 = 0xD2511F53
+M1 = 0xCD9E8D57
+W0 = 0x9E3779B9
+W1 = 0xBB67AE85
+ROUNDS = 10
+
+def philox(c0, c1, c2, c3, k0, k1):
+    # Philox4x32-10 (Salmon et al., SC'11) over arrays of 32-bit words held in uint64,
+    # so each 32x32-bit product fits without overflow
+    c0, c1, c2, c3 = (np.asarray(c, dtype=np.uint64) for c in (c0, c1, c2, c3))
+    mask = np.uint64(MASK)
+    shift = np.uint64(32)
+    for r in range(ROUNDS):
+        p0 = c0 * np.uint64(M0)
+        p1 = c2 * np.uint64(M1)
+        c0, c1, c2, c3 = ((p1 >> shift) ^ c1 ^ np.uint64((k0 + r * W0) & MASK), p1 & mask,
+                          (p0 >> shift) ^ c3 ^ np.uint64((k1 + r * W1) & MASK), p0 & mask)
+    return c0, c1, c2, c3
+
+def philox_scalar(c0, c1, c2, c3, k0, k1):
+    # The same block function on Python ints, for one draw at a time
+    for _ in range(ROUNDS):
+        p0 = c0 * M0
+        p1 = c2 * M1
+        c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k0, p1 & MASK, (p0 >> 32) ^ c3 ^ k1, p0 & MASK
+        k0 = (k0 + W0) & MASK
+        k1 = (k1 + W1) & MASK
+    return c0, c1, c2, c3
+
+# Counter-based random numbers: the draw-th uniform of (node id, cycle, purpose) is the
+# Philox block of counter (id, cycle, purpose, draw) under a key derived from (seed, run).
+# Nothing is carried from one draw to the next, so values do not depend on the order nodes
+# are visited in, on which of them are vectorized together, or on which process runs them.
+# Uniforms take 53 bits like random.random(), and uniform(a, b) is a + (b - a) * u like
+# random.uniform(), so bulk and per-node draws agree bit for bit.
+class CounterRNG:
+    def __init__(self, seed=None, run=0):
+        self.seed = seed
+        self.run = run
+        self.key = [int(k) for k in np.random.SeedSequence(seed, spawn_key=(run,)).generate_state(2, np.uint32)]
+
+    def uniforms(self, purpose, cycle, ids, draw=0):
+        # One uniform per node id in ids
+        w0, w1, _, _ = philox(ids, cycle & MASK, PURPOSES[purpose], draw, *self.key)
+        bits = (w0 >> np.uint64(5)) * np.uint64(67108864) + (w1 >> np.uint64(6))
+        return np.atleast_1d(bits).astype(np.float64) * (1.0 / 9007199254740992)
+
+    def uniform_at(self, purpose, cycle, node_id, draw=0):
+        w0, w1, _, _ = philox_scalar(node_id, cycle & MASK, PURPOSES[purpose], draw, *self.key)
+        return ((w0 >> 5) * 67108864 + (w1 >> 6)) * (1.0 / 9007199254740992)
+
+    def stream(self, node_id, cycle, purpose):
+        return NodeStream(self, node_id, cycle, purpose)
+
+# One node's stream for one cycle and purpose, with the random.Random methods nodes call
+class NodeStream:
+    def __init__(self, rng, node_id, cycle, purpose):
+        self.rng = rng
+        self.node_id = node_id
+        self.cycle = cycle
+        self.purpose = purpose
+        self.draws = 0
+
+    def random(self):
+        u = self.rng.uniform_at(self.purpose, self.cycle, self.node_id, self.draws)
+        self.draws += 1
+        return u
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
@@ -0,0 +1,145 @@
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from engine import build_engine
+
+# Keys of a sweep configuration that drive the run rather than build_engine()
+RUN_KEYS = ('cycles', 'fast_forward', 'keep_running')
+NODE_KEYS = ('energy_per_sense', 'energy_per_transmit', 'sensing_range')
+METRICS = ['cycles', 'delivered', 'data_points', 'dead_nodes', 'nodes', 'first_death', 'half_dead',
+           'reachable', 'delivery_ratio', 'elapsed']
+# Results table columns holding the configuration, kept apart from the metrics ('cycles' is both)
+CONFIG_PREFIX = 'config.'
+
+def grid(**axes):
+    # Cartesian product of the given value lists, one dict per point
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+def config_key(config):
+    return json.dumps(config, sort_keys=True)
+
+def run_config(config):
+    # Build and run one engine headless; returns the row of summary metrics.
+    # policy may be a POLICIES name or the DutyCyclePolicy keyword arguments as a dict.
+    options = {k: v for k, v in config.items() if k not in RUN_KEYS and k not in NODE_KEYS}
+    node_attrs = {k: config[k] for k in NODE_KEYS if k in config}
+    if isinstance(options.get('policy'), dict):
+        from dutycycle import DutyCyclePolicy
+        options['policy'] = DutyCyclePolicy(**options['policy'])
+    if 'field_size' in options:
+        options['field_size'] = tuple(options['field_size'])
+    engine = build_engine(node_attrs=node_attrs, **options)
+    start = time.perf_counter()
+    summary = engine.run(config.get('cycles', 100), stop_when_depleted=not config.get('keep_running', False),
+                         fast_forward=config.get('fast_forward', False))
+    elapsed = time.perf_counter() - start
+    deaths = [cycle for cycle, _ in engine.deaths]
+    half = (summary['nodes'] + 1) // 2
+    return {
+        'cycles': summary['cycles'],
+        'delivered': sum(summary['sink_throughput']),
+        'data_points': summary['data_points'],
+        'dead_nodes': summary['dead_nodes'],
+        'nodes': summary['nodes'],
+        'first_death': deaths[0] if deaths else '',
+        'half_dead': deaths[half - 1] if len(deaths) >= half else '',
+        'reachable': '' if summary['reachable'] is None else summary['reachable'],
+        'delivery_ratio': '' if engine.channel is None else round(engine.channel.delivery_ratio(), 6),
+        'elapsed': round(elapsed, 4),
+    }
+
+def _load_done(path):
+    # (header, {config key: row}) of the results table from an earlier run
+    if not os.path.exists(path):
+        return [], {}
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        done = {row['config']: row for row in reader}
+        return reader.fieldnames or [], done
+
+def run_sweep(configs, output='sweep.csv', workers=None):
+    # Run every configuration across a process pool, appending one CSV row per finished run
+    # so an interrupted sweep resumes where it stopped. Returns all rows, in config order.
+    # Configuration values go in CONFIG_PREFIX columns, metrics under their own names.
+    header, done = _load_done(output)
+    columns = {CONFIG_PREFIX + k for config in configs for k in config}
+    columns |= {c for c in header if c not in METRICS and c != 'config'}
+    fields = sorted(columns) + METRICS + ['config']
+    pending = [config for config in configs if config_key(config) not in done]
+    if fields != header:
+        # New table, or configuration keys it has no column for yet: rewrite it with every column
+        with open(output + '.tmp', 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval='', extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(done.values())
+        os.replace(output + '.tmp', output)
+    with open(output, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields, restval='', extrasaction='ignore')
+        if pending:
+            # One task per configuration keeps every core busy until the queue drains
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                futures = {pool.submit(run_config, config): config for config in pending}
+                for count, future in enumerate(as_completed(futures), 1):
+                    config = futures[future]
+                    row = {CONFIG_PREFIX + k: v for k, v in config.items()}
+                    row.update(future.result(), config=config_key(config))
+                    row = {k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in row.items()}
+                    writer.writerow(row)
+                    f.flush()
+                    done[row['config']] = row
+                    print(f"[{count}/{len(pending)}] {row['config']}", file=sys.stderr)
+    return [done[config_key(config)] for config in configs]
+
+def format_table(rows, columns):
+    widths = [max(len(str(c)), *(len(str(row.get(c, ''))) for row in rows)) for c in columns]
+    lines = ['  '.join(str(c).ljust(w) for c, w in zip(columns, widths))]
+    lines += ['  '.join(str(row.get(c, '')).ljust(w) for c, w in zip(columns, widths)) for row in rows]
+    return '\n'.join(lines)
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parameter sweep of the headless engine over a process pool")
+    parser.add_argument('--grid', nargs='+', default=[], metavar='KEY=V1,V2',
+                        help="sweep axis, e.g. comm_range=30,50,80 (values parsed as JSON where possible)")
+    parser.add_argument('--configs', default=None, metavar='FILE',
+                        help="JSON lines file with one configuration per line (combined with --grid)")
+    parser.add_argument('--set', nargs='+', default=[], metavar='KEY=VALUE', help="fixed setting for every run")
+    parser.add_argument('--output', default='sweep.csv', help="results table; rerunning resumes from it")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    fixed = {}
+    for item in args.set:
+        key, _, value = item.partition('=')
+        fixed[key] = _parse_value(value)
+    axes = {}
+    for item in args.grid:
+        key, _, values = item.partition('=')
+        try:
+            axes[key] = json.loads('[' + values + ']')
+        except ValueError:
+            axes[key] = [_parse_value(v) for v in values.split(',')]
+    base = []
+    if args.configs:
+        with open(args.configs) as f:
+            base = [json.loads(line) for line in f if line.strip()]
+    # Later sources win: grid points over --configs lines over --set
+    configs = [{**fixed, **b, **point} for b in (base or [{}]) for point in grid(**axes)]
+    rows = run_sweep(configs, args.output, args.workers)
+    print(format_table(rows, [CONFIG_PREFIX + axis for axis in axes]
+                       + ['delivered', 'dead_nodes', 'first_death', 'half_dead', 'elapsed']))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+from engine import build_engine
+
+def test_delivered_flags_match_sink_counts():
+    # Low batteries make relays die mid-cycle, after readings were queued behind them
+    engine = build_engine(150, (250, 250), 'random', comm_range=45, seed=6, multihop=True, aggregate=True,
+                          node_attrs={'battery': 3.0})
+    dropped = 0
+    while engine.alive_count() and engine.cycle < 400:
+        before = sum(engine.sink_throughput())
+        readings = engine.step()
+        delivered = sum(flag for _, _, flag in readings)
+        assert delivered == sum(engine.sink_throughput()) - before
+        dropped += len(readings) - delivered
+    assert engine.deaths and dropped
+
+def test_aggregates_keep_every_reading():
+    engine = build_engine(150, (250, 250), 'random', comm_range=45, seed=6, multihop=True, aggregate=True)
+    engine.run(50)
+    counts = engine.base_station.collected_data.columns(['count'])['count']
+    assert counts.sum() == engine.base_station.received
+    assert len(counts) < engine.base_station.received
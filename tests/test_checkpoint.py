@@ -0,0 +1,56 @@
+import checkpoint
+from engine import build_engine
+
+def fingerprint(engine):
+    engine.sync_nodes()
+    return ([(node.battery, node.active, node.value) for node in engine.nodes], engine.deaths,
+            engine.sink_throughput(), engine.base_station.collected_data.total, engine.cycle)
+
+def build(**options):
+    engine = build_engine(150, (200, 200), 'random', seed=4, node_attrs={'energy_per_sense': 0.3}, **options)
+    if options.get('multihop'):
+        engine.track_connectivity()
+    return engine
+
+def test_resumed_run_matches_uninterrupted(tmp_path):
+    path = str(tmp_path / 'engine.ckpt')
+    for options, half in ((dict(), 200), (dict(backend='array'), 200), (dict(lpwan=True, streams=True), 200),
+                          (dict(multihop=True), 200), (dict(field_length=20.0), 30),
+                          (dict(field_length=20.0, backend='array'), 30)):
+        reference = build(**options)
+        reference.run(2 * half, stop_when_depleted=False)
+        engine = build(**options)
+        engine.run(half, stop_when_depleted=False)
+        checkpoint.save(engine, path)
+        assert checkpoint.read_header(path)['cycle'] == half
+        for mapped in (True, False):
+            restored = checkpoint.load(path, mapped=mapped)
+            restored.run(half, stop_when_depleted=False)
+            assert fingerprint(restored) == fingerprint(reference), (options, mapped)
+
+def test_node_list_shared_after_load(tmp_path):
+    path = str(tmp_path / 'engine.ckpt')
+    engine = build(multihop=True)
+    engine.run(50)
+    checkpoint.save(engine, path)
+    restored = checkpoint.load(path)
+    assert restored.router.nodes is restored.nodes
+    assert restored.connectivity.nodes is restored.nodes
+    assert restored.router.nodes[0] is restored.nodes[0]
+    restored.nodes[0].active = False
+    assert not restored.router.nodes[0].active
+
+def test_checkpoint_cadence_survives_jumps(tmp_path):
+    # Fast-forward and idle jumps must not skip over a checkpoint cycle
+    pattern = str(tmp_path / 'engine-{cycle}.ckpt')
+    for options, fast_forward in ((dict(comm_range=200), True), (dict(comm_range=200, backend='array'), True),
+                                  (dict(lpwan=True, wake_queue=True, policy='frugal'), False)):
+        for path in tmp_path.iterdir():
+            path.unlink()
+        engine = build_engine(60, (200, 200), 'random', seed=2, **options)
+        engine.run(1000, fast_forward=fast_forward, checkpoint_every=150, checkpoint_path=pattern)
+        saved = sorted(int(path.stem.split('-')[1]) for path in tmp_path.iterdir())
+        assert saved == list(range(150, engine.cycle + 1, 150)), options
+        assert all(checkpoint.read_header(pattern.format(cycle=c))['cycle'] == c for c in saved)
+        if fast_forward:
+            assert engine.skipped > 0
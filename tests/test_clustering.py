@@ -0,0 +1,67 @@
+import numpy as np
+from clustering import LEACH, nearest_in_grid
+from engine import build_engine
+
+def test_nearest_in_grid_matches_brute_force():
+    rng = np.random.default_rng(3)
+    for points, targets, cell in ((500, 40, 30.0), (500, 3, 5.0), (200, 200, 100.0)):
+        px, py = rng.uniform(0, 300, points), rng.uniform(0, 300, points)
+        tx, ty = rng.uniform(0, 300, targets), rng.uniform(0, 300, targets)
+        best, d2 = nearest_in_grid(px, py, tx, ty, cell)
+        full = (px[:, None] - tx) ** 2 + (py[:, None] - ty) ** 2
+        assert (best == full.argmin(axis=1)).all()
+        assert np.allclose(d2, full.min(axis=1))
+
+def test_heads_out_of_sink_range_deliver_nothing():
+    for aggregate in (False, True):
+        engine = build_engine(2000, (1000, 1000), 'random', comm_range=50, seed=1, backend='array', leach=0.05,
+                              aggregate=aggregate)
+        array = engine.array
+        sensed = array.sense(engine.rng, None, 1)
+        delivered, via, groups = engine.clustering.transmit(engine.rng, sensed, 1)
+        reach = array.distance_to(engine.base_stations) <= array.comm_range
+        assert reach[via].all()
+        if groups is not None:
+            assert reach[groups[0]].all()
+        assert len(delivered) <= reach.sum()
+
+def test_members_reach_their_head():
+    engine = build_engine(1000, (300, 300), 'random', seed=2, backend='array', leach=0.1)
+    engine.run(20)
+    clustering = engine.clustering
+    array = engine.array
+    members = np.flatnonzero(clustering.head_of >= 0)
+    heads = clustering.head_of[members]
+    assert np.isin(heads, clustering.heads).all()
+    distance = np.hypot(array.x[members] - array.x[heads], array.y[members] - array.y[heads])
+    assert (distance <= array.comm_range[members]).all()
+
+def test_rejoin_after_head_death_matches_full_assignment():
+    engine = build_engine(2000, (400, 400), 'random', seed=4, backend='array')
+    array = engine.array
+    clustering = LEACH(array, engine.base_stations, p=0.05, round_length=10)
+    clustering.transmit(engine.rng, array.sense(engine.rng, None, 1), 1)
+    dead = clustering.heads[::3]
+    array.battery[dead] = 0.0
+    array.active[dead] = False
+    clustering.transmit(engine.rng, array.sense(engine.rng, None, 2), 2)
+    incremental = clustering.head_of.copy()
+    clustering.assign()
+    assert (incremental == clustering.head_of).all()
+    assert not np.isin(incremental, dead).any()
+
+def test_only_awake_nodes_lead_and_heads_pay_to_relay():
+    engine = build_engine(2000, (400, 400), 'random', lpwan=True, policy='frugal', seed=3, backend='array')
+    array = engine.array
+    clustering = LEACH(array, engine.base_stations, p=0.05, round_length=3)
+    asleep_relays = 0
+    for cycle in range(1, 31):
+        sensed = array.sense(engine.rng, None, cycle)
+        before = array.battery.copy()
+        delivered, via, _ = clustering.transmit(engine.rng, sensed, cycle)
+        if (cycle - 1) % 3 == 0:
+            assert np.isin(clustering.heads, sensed).all()
+        relays = np.setdiff1d(np.unique(via[np.isin(via, clustering.heads)]), sensed)
+        assert (array.battery[relays] < before[relays]).all()
+        asleep_relays += len(relays)
+    assert asleep_relays
@@ -0,0 +1,40 @@
+import math
+import numpy as np
+from collision import AlohaChannel, collisions
+
+def brute_lost(start, end, group, power, capture_db):
+    lost = np.zeros(len(start), dtype=bool)
+    for i in range(len(start)):
+        overlapping = [j for j in range(len(start)) if j != i and group[j] == group[i]
+                       and start[j] < end[i] and start[i] < end[j]]
+        if capture_db is None:
+            lost[i] = bool(overlapping)
+        else:
+            lost[i] = bool(overlapping) and power[i] - max(power[j] for j in overlapping) < capture_db
+    return lost
+
+def test_collisions_match_brute_force():
+    rng = np.random.default_rng(0)
+    for trial in range(300):
+        n = int(rng.integers(1, 60))
+        start = rng.random(n) * 10
+        end = start + rng.random(n) * rng.choice([0.2, 1, 3])
+        if trial % 5 == 0:
+            # Touching intervals (end == next start) do not overlap
+            start = np.round(start)
+            end = np.maximum(np.round(end), start + 1)
+        group = rng.integers(0, 3, n)
+        power = rng.normal(0, 5, n)
+        capture_db = (None, 6.0)[trial % 2]
+        assert (collisions(start, end, group, power, capture_db) == brute_lost(start, end, group, power,
+                                                                              capture_db)).all(), trial
+
+def test_aloha_delivery_follows_theory():
+    # Equal airtimes on one channel without capture: P(no overlap) ~ exp(-2 n T / W)
+    channel = AlohaChannel(window=600.0, channels=1, capture_db=None, seed=2)
+    distance = np.full(400, 100.0)
+    for _ in range(50):
+        channel.resolve(distance, np.zeros(len(distance), dtype=np.int64))
+    airtime = channel.packets(distance[:1])[1][0]
+    expected = math.exp(-2 * len(distance) * airtime / (channel.window - airtime))
+    assert abs(channel.delivery_ratio() - expected) < 0.02
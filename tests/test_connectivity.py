@@ -0,0 +1,58 @@
+import random
+from collections import deque
+from network import SensorNode, BaseStation
+from spatial import SpatialHash
+from connectivity import ConnectivityTracker, reachable_after_deaths
+from engine import build_engine
+
+# Brute-force BFS: live nodes with a directed path of transmissions to a sink
+def brute_reachable(nodes, sinks, alive):
+    seen = set()
+    queue = deque()
+    for i in alive:
+        node = nodes[i]
+        if any((node.x - s.x) ** 2 + (node.y - s.y) ** 2 <= node.comm_range ** 2 for s in sinks):
+            seen.add(i)
+            queue.append(i)
+    while queue:
+        i = queue.popleft()
+        for j in alive - seen:
+            node = nodes[j]
+            if (node.x - nodes[i].x) ** 2 + (node.y - nodes[i].y) ** 2 <= node.comm_range ** 2:
+                seen.add(j)
+                queue.append(j)
+    return len(seen)
+
+def test_tracker_matches_brute_force():
+    for trial in range(8):
+        rng = random.Random(trial)
+        # Mixed comm ranges make links one-way
+        nodes = [SensorNode(i, rng.uniform(0, 300), rng.uniform(0, 300), 'ph',
+                            comm_range=rng.choice([40, 50, 60]) if trial % 2 else 50) for i in range(120)]
+        sinks = [BaseStation(150, 150)] if trial % 3 else [BaseStation(50, 50), BaseStation(250, 250)]
+        index = SpatialHash.from_nodes(nodes)
+        tracker = ConnectivityTracker(nodes, sinks, index)
+        alive = set(range(len(nodes)))
+        assert tracker.reachable == brute_reachable(nodes, sinks, alive)
+        order = list(alive)
+        rng.shuffle(order)
+        online = []
+        for k, i in enumerate(order[:100]):
+            index.remove(i)
+            tracker.remove(i, k)
+            alive.discard(i)
+            assert tracker.reachable == brute_reachable(nodes, sinks, alive)
+            assert all(tracker.is_reachable(j) == (tracker.parent[j] is not None) for j in alive)
+            online.append(tracker.reachable)
+        if trial % 2 == 0:
+            # Shared comm_range: the offline union-find replay agrees after every death
+            assert reachable_after_deaths(nodes, sinks, order[:100]) == online
+
+def test_engine_tracks_deaths_on_both_backends():
+    for backend in ('objects', 'array'):
+        engine = build_engine(150, (300, 300), 'random', comm_range=50, seed=4, backend=backend)
+        engine.track_connectivity()
+        engine.run(3000)
+        alive = {i for i, node in enumerate(engine.nodes) if node.active}
+        assert engine.deaths
+        assert engine.connectivity.reachable == brute_reachable(engine.nodes, engine.base_stations, alive)
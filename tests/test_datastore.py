@@ -0,0 +1,73 @@
+import pickle
+import random
+import numpy as np
+from datastore import ReadingStore
+from network import DATA_TYPES
+
+# Random mix of single appends and batches checked against a plain list of the newest rows
+def check_against_list(retention, chunk, seed):
+    rng = random.Random(seed)
+    store = ReadingStore(retention, chunk=chunk)
+    expected = []
+    for tick in range(200):
+        if rng.random() < 0.5:
+            row = (rng.randrange(100), tick, rng.choice(DATA_TYPES), rng.random())
+            store.append(*row)
+            expected.append(row)
+        else:
+            n = rng.randrange(0, 3 * chunk)
+            rows = [(rng.randrange(100), tick, rng.choice(DATA_TYPES), rng.random()) for _ in range(n)]
+            store.extend([r[0] for r in rows], tick, [r[2] for r in rows], [r[3] for r in rows])
+            expected += rows
+        if retention is not None:
+            expected = expected[-retention:]
+        if tick % 17 == 0:
+            # Reads flush staged appends mid-stream
+            assert len(store) == len(expected)
+    columns = store.columns()
+    assert columns['node_id'].tolist() == [r[0] for r in expected]
+    assert columns['tick'].tolist() == [r[1] for r in expected]
+    assert [DATA_TYPES[t] for t in columns['type']] == [r[2] for r in expected]
+    assert columns['value'].tolist() == [r[3] for r in expected]
+    return store, expected
+
+def test_ring_buffer_keeps_newest_rows():
+    for retention in (None, 1, 7, 50, 333):
+        for chunk in (4, 16):
+            store, expected = check_against_list(retention, chunk, retention or 0)
+            assert len(store) == len(expected)
+            assert store.total >= len(store)
+            if retention is not None:
+                assert len(store) == min(retention, store.total)
+            last = store.last(5)
+            assert [(row['node_id'], row['timestamp'], row['data']) for row in last] == \
+                [(r[0], f"cycle {r[1]}", {r[2]: r[3]}) for r in expected[-5:]]
+            assert [row['node_id'] for row in store] == [r[0] for r in expected]
+            assert store[-1] == last[-1]
+
+def test_total_counts_dropped_rows():
+    store = ReadingStore(retention=10, chunk=4)
+    for i in range(25):
+        store.append(i, i, 'temperature', float(i))
+    store.extend(list(range(30)), 30, ['humidity'] * 30, [0.5] * 30)
+    assert store.total == 55
+    assert len(store) == 10
+    assert store.columns()['node_id'].tolist() == list(range(20, 30))
+
+def test_columns_are_views_until_wrapped():
+    store = ReadingStore(retention=8, chunk=8)
+    store.extend(list(range(6)), 0, ['ph'] * 6, [1.0] * 6)
+    assert np.shares_memory(store.columns()['value'], store._cols['value'])
+    store.extend(list(range(6, 10)), 1, ['ph'] * 4, [2.0] * 4)
+    assert len(store.segments()) == 2
+    values = store.columns()['value']
+    assert not np.shares_memory(values, store._cols['value'])
+    assert store.columns()['node_id'].tolist() == list(range(2, 10))
+
+def test_pickle_keeps_retained_rows():
+    store, expected = check_against_list(40, 16, 3)
+    copy = pickle.loads(pickle.dumps(store))
+    assert list(copy) == list(store)
+    assert copy.total == store.total
+    copy.append(1, 999, 'ph', 7.0)
+    assert len(copy) == 40 and copy[-1]['data'] == {'ph': 7.0}
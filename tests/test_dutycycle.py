@@ -0,0 +1,23 @@
+import numpy as np
+from dutycycle import POLICIES
+from network import DATA_TYPES, LPWANSensorNode
+
+def test_evaluate_matches_duty_for_and_nodes():
+    rng = np.random.default_rng(0)
+    battery = np.concatenate((rng.uniform(-5, 100, 400), [0.0, 20.0, 50.0, 80.0]))
+    codes = rng.integers(len(DATA_TYPES), size=len(battery))
+    values = rng.uniform(0, 1000, len(battery))
+    values[::7] = np.nan
+    for name, policy in POLICIES.items():
+        duty = policy.evaluate(battery, values, codes)[0]
+        for i in range(len(battery)):
+            last = None if np.isnan(values[i]) else float(values[i])
+            expected = policy.duty_for(float(battery[i]), last, DATA_TYPES[codes[i]])
+            assert duty[i] == expected, (name, i)
+            node = LPWANSensorNode(i, 0.0, 0.0, DATA_TYPES[codes[i]], battery=float(battery[i]))
+            node.last_value = last
+            if name != 'default':
+                node.policy = policy  # Without one the node follows the default policy
+            node.update_duty_cycle()
+            assert node.duty_cycle == expected
+            assert node.active == (battery[i] > 0)
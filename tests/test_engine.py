@@ -0,0 +1,62 @@
+import subprocess
+import sys
+import pytest
+from engine import build_engine, main
+from network import SensorNode
+
+# The reference: the original GUI timer loop, one sense/transmit pass over the node list per tick
+def timer_loop(engine, cycles):
+    for _ in range(cycles):
+        engine.cycle += 1
+        for node in engine.nodes:
+            if not node.active:
+                continue
+            if node.sense_environment(engine.rng) is not None:
+                data = node.data
+                if node.transmit_data(engine.base_station):
+                    engine.base_station.receive_data(node.id, data, node.duty_cycle)
+        if not any(node.active for node in engine.nodes):
+            break
+
+def readings(engine):
+    return [(row['node_id'], row['data'], row['duty_cycle']) for row in engine.base_station.collected_data]
+
+def test_engine_matches_timer_loop():
+    for lpwan in (False, True):
+        reference = build_engine(100, (300, 300), 'random', lpwan=lpwan, seed=1, comm_range=None if lpwan else 80)
+        engine = build_engine(100, (300, 300), 'random', lpwan=lpwan, seed=1, comm_range=None if lpwan else 80)
+        timer_loop(reference, 1500)
+        engine.run(1500)
+        assert readings(engine) == readings(reference)
+        assert [node.battery for node in engine.nodes] == [node.battery for node in reference.nodes]
+        assert [node.active for node in engine.nodes] == [node.active for node in reference.nodes]
+
+def test_engine_runs_without_qt():
+    code = ("import sys, engine; engine.build_engine(20, seed=1).run(50); "
+            "print(any(name.startswith('PyQt') for name in sys.modules))")
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == 'False'
+
+def test_cli_summary(capsys):
+    assert main(['--nodes', '10', '--cycles', '20', '--seed', '2']) == 0
+    out = capsys.readouterr().out
+    assert 'Cycles: 20' in out
+    assert 'Dead Nodes: ' in out
+
+def test_at_least_one_sink():
+    with pytest.raises(ValueError):
+        build_engine(10, sinks=0)
+    with pytest.raises(SystemExit):
+        main(['--nodes', '10', '--sinks', '0'])
+
+def test_delivery_builds_no_reading_dicts(monkeypatch):
+    # node.data is kept for display code only; the engine hands sinks the type and value
+    def no_dict(node):
+        raise AssertionError("built a reading dict")
+    monkeypatch.setattr(SensorNode, 'data', property(no_dict))
+    for options in (dict(), dict(lpwan=True, mac='aloha'), dict(multihop=True, comm_range=60)):
+        engine = build_engine(40, (150, 150), 'random', seed=2, **options)
+        readings = engine.step()
+        rows = engine.base_station.collected_data.columns()
+        assert rows['value'].tolist() == [value for _, value, delivered in readings if delivered]
+        engine.run(100)
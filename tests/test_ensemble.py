@@ -0,0 +1,42 @@
+import math
+import random
+import statistics
+from ensemble import RunningStats, run_ensemble, t_quantile
+
+CONFIG = {'num_nodes': 8, 'layout': 'random', 'field_size': [150, 150], 'cycles': 30}
+
+def test_running_stats_match_statistics():
+    rng = random.Random(4)
+    values = [rng.gauss(1e6, 3.0) for _ in range(500)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.count == 500
+    assert math.isclose(stats.mean, statistics.fmean(values), rel_tol=1e-12)
+    assert math.isclose(stats.variance(), statistics.variance(values), rel_tol=1e-9)
+
+def test_t_quantiles():
+    # Two-sided critical values from standard t tables
+    for confidence, df, expected in ((0.95, 1, 12.7062), (0.95, 2, 4.3027), (0.95, 9, 2.2622),
+                                     (0.99, 4, 4.6041), (0.90, 30, 1.6973), (0.95, 1000, 1.9623)):
+        assert math.isclose(t_quantile(confidence, df), expected, abs_tol=1e-4), (confidence, df)
+    stats = RunningStats()
+    for value in (1.0, 2.0, 4.0):
+        stats.add(value)
+    assert math.isclose(stats.half_width(0.95), 4.3027 * math.sqrt(stats.variance() / 3), rel_tol=1e-4)
+
+def test_fold_order_independent_of_workers():
+    runs = [run_ensemble(CONFIG, {'delivered': 0.0}, min_replicas=2, max_replicas=6, seed=3, workers=workers)
+            for workers in (1, 3)]
+    assert runs[0]['replicas'] == runs[1]['replicas'] == 6
+    for metric, stats in runs[0]['stats'].items():
+        if metric == 'elapsed':
+            continue  # Wall time
+        other = runs[1]['stats'][metric]
+        assert (stats.count, stats.mean, stats.m2) == (other.count, other.mean, other.m2), metric
+
+def test_stops_at_convergence():
+    wide = run_ensemble(CONFIG, {'delivered': 1e9}, min_replicas=3, max_replicas=50, workers=2)
+    assert wide['converged'] and wide['replicas'] == 3
+    narrow = run_ensemble(CONFIG, {'delivered': 0.0}, min_replicas=3, max_replicas=5, workers=2)
+    assert not narrow['converged'] and narrow['replicas'] == 5
@@ -0,0 +1,19 @@
+import math
+from engine import build_engine
+
+def test_fast_forward_matches_stepping():
+    for kwargs in ({}, {'backend': 'array'}, {'sinks': 4}, {'comm_range': 80}):
+        runs = []
+        for fast_forward in (False, True):
+            engine = build_engine(200, (300, 300), 'random', seed=2, **{'comm_range': 200, **kwargs})
+            summary = engine.run(5000, fast_forward=fast_forward)
+            engine.sync_nodes()
+            runs.append((engine, summary))
+        (stepped, plain), (skipped, fast) = runs
+        assert skipped.skipped > 0
+        assert fast['cycles'] == plain['cycles']
+        assert fast['sink_throughput'] == plain['sink_throughput']
+        assert skipped.deaths == stepped.deaths
+        for a, b in zip(stepped.nodes, skipped.nodes):
+            assert a.active == b.active
+            assert math.isclose(a.battery, b.battery, rel_tol=1e-9, abs_tol=1e-9)
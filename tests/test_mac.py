@@ -0,0 +1,46 @@
+import numpy as np
+from mac import CSMAChannel
+from engine import build_engine
+
+def test_transmission_end_frees_channel_at_same_instant():
+    channel = CSMAChannel(channels=1, sense_range=100.0)
+    airtime = channel.slot
+    # Packet 1 sends at 0; packet 0, in earshot, is ready exactly when that ends
+    start = channel.access([airtime, 0.0], [0, 0], [0.0, 10.0], [0.0, 0.0], [airtime, airtime], [[0.5] * 5] * 2)
+    assert start == [airtime, 0.0]
+    assert channel.backoffs == 0
+
+def test_carrier_sense_under_contention():
+    rng = np.random.default_rng(1)
+    n = 1500
+    channel = CSMAChannel(channels=2, sense_range=300.0, max_retries=3, seed=1)
+    x, y = rng.uniform(0, 2000, n), rng.uniform(0, 2000, n)
+    chans = rng.integers(2, size=n)
+    airtime = np.full(n, channel.slot)
+    start = np.array(channel.access((rng.random(n) * 5.0).tolist(), chans.tolist(), x.tolist(), y.tolist(),
+                                    airtime.tolist(), rng.random((n, 3)).tolist()))
+    sent = np.flatnonzero(~np.isnan(start))
+    assert channel.backoffs and len(sent) < n
+    # No two packets on air at once on a channel from senders within earshot of each other
+    s, e = start[sent], start[sent] + airtime[sent]
+    overlap = (s[:, None] < e[None, :]) & (s[None, :] < e[:, None]) & (chans[sent][:, None] == chans[sent][None, :])
+    np.fill_diagonal(overlap, False)
+    near = np.hypot(x[sent][:, None] - x[sent][None, :], y[sent][:, None] - y[sent][None, :]) <= 300.0
+    assert not (overlap & near).any()
+    assert overlap.any()  # Hidden terminals still collide
+
+def test_dropped_packets_cost_no_energy():
+    for backend in ('objects', 'array'):
+        engine = build_engine(1500, (600, 600), 'random', lpwan=True, mac='csma', channels=1, seed=2,
+                              minutes_per_cycle=0.05, backend=backend)
+        channel = engine.channel
+        channel.sense_range = 60.0
+        channel.max_retries = 1
+        before = np.array([node.battery for node in engine.nodes])
+        engine.step()
+        engine.sync_nodes()
+        spent = before - np.array([node.battery for node in engine.nodes])
+        sense_only = np.isclose(spent, np.array([node.energy_per_sense for node in engine.nodes]))
+        assert channel.dropped > 0
+        assert sense_only.sum() == channel.dropped
+        assert channel.lost > channel.dropped
@@ -0,0 +1,22 @@
+from engine import build_engine
+
+def fingerprint(engine):
+    engine.sync_nodes()
+    return ([(node.battery, node.active, node.value) for node in engine.nodes], engine.deaths,
+            engine.sink_throughput(), [row['data'] for row in engine.base_station.collected_data])
+
+def test_array_backend_reproduces_objects():
+    for kwargs, cycles in (({}, 2000), ({'comm_range': 60}, 2000), ({'sinks': 4}, 2000),
+                           ({'field_length': 40.0}, 200)):
+        runs = [build_engine(150, (200, 200), 'random', seed=5, backend=backend, **kwargs)
+                for backend in ('objects', 'array')]
+        for engine in runs:
+            engine.run(cycles)
+        assert fingerprint(runs[0]) == fingerprint(runs[1]), kwargs
+
+def test_wake_queue_runs_to_depletion():
+    # Cycles where every due node dies leave nothing to park
+    engine = build_engine(30, (200, 200), 'random', lpwan=True, seed=3, backend='array', wake_queue=True,
+                          node_attrs={'energy_per_sense': 0.5})
+    engine.run(5000)
+    assert engine.deaths and not engine.array.active.any()
@@ -0,0 +1,71 @@
+import heapq
+import math
+import random
+from engine import build_engine
+from radio import SPREADING_FACTORS, LoRaRadio, time_on_air
+
+# (sf, payload bytes, seconds) from the Semtech LoRa calculator: 125 kHz, CR 4/5, 8-symbol
+# preamble, explicit header, CRC on; low data rate optimisation from SF11
+AIRTIMES = [(7, 10, 0.041216), (7, 20, 0.056576), (11, 10, 0.577536), (12, 10, 0.991232), (12, 51, 2.465792)]
+
+def test_time_on_air_matches_calculator():
+    for sf, payload, seconds in AIRTIMES:
+        assert math.isclose(time_on_air(sf, payload), seconds, rel_tol=1e-9), (sf, payload)
+
+def test_spreading_factor_is_fastest_that_closes_link():
+    radio = LoRaRadio()
+    ranges = [radio.range_of(sf) for sf in SPREADING_FACTORS]
+    assert ranges == sorted(ranges)
+    for distance in [0.0, 1.0] + [r * f for r in ranges for f in (0.97, 1.03)] + [radio.max_range * 2]:
+        expected = next((sf for sf, r in zip(SPREADING_FACTORS, ranges) if r >= distance + radio.resolution), None)
+        sf = radio.spreading_factor(distance)
+        if expected is not None:
+            assert sf == expected, distance
+        elif distance > radio.max_range + radio.resolution:
+            assert sf == 0, distance
+    distances = [random.Random(1).uniform(0, 1.2 * radio.max_range) for _ in range(500)]
+    assert radio.spreading_factors(distances).tolist() == [radio.spreading_factor(d) for d in distances]
+
+def test_packet_energy_is_airtime_times_power():
+    radio = LoRaRadio(tx_current=0.05, voltage=3.0, joules_per_unit=100.0)
+    for sf in SPREADING_FACTORS:
+        distance = radio.range_of(sf) - 2 * radio.resolution
+        for scale in (1.0, 2.0):
+            got, airtime, energy = radio.packet_energy(distance, scale)
+            n = radio.payload_bytes(scale)
+            assert got == radio.spreading_factor(distance)
+            assert airtime == time_on_air(got, n)
+            assert math.isclose(energy, airtime * 0.05 * 3.0 / 100.0)
+            assert radio.energies([got], scale)[0] == energy
+    assert radio.packet_energy(radio.max_range * 1.5) is None
+
+# Dijkstra over all live pairs, pricing hops by airtime energy within the relay range
+def brute_costs(nodes, sinks, hop_range):
+    cost = []
+    for node in nodes:
+        packets = [node.radio.packet_energy(math.hypot(node.x - s.x, node.y - s.y)) for s in sinks]
+        cost.append(min((p[2] for p in packets if p is not None), default=math.inf))
+    heap = [(c, i) for i, c in enumerate(cost) if c < math.inf]
+    heapq.heapify(heap)
+    done = set()
+    while heap:
+        c, i = heapq.heappop(heap)
+        if i in done:
+            continue
+        done.add(i)
+        for j, node in enumerate(nodes):
+            d = math.hypot(node.x - nodes[i].x, node.y - nodes[i].y)
+            packet = node.radio.packet_energy(d)
+            if j not in done and d <= hop_range and packet is not None and c + packet[2] < cost[j]:
+                cost[j] = c + packet[2]
+                heapq.heappush(heap, (cost[j], j))
+    return cost
+
+def test_multihop_prices_hops_by_airtime():
+    engine = build_engine(300, (12000, 12000), 'random', lpwan=True, multihop=True, radio=True, seed=2)
+    router = engine.router
+    expected = brute_costs(engine.nodes, engine.base_stations, router.hop_range)
+    assert all(math.isclose(a, b) or a == b for a, b in zip(router.cost, expected))
+    assert any(hop is not None and hop >= 0 for hop in router.parent)
+    engine.run(20)
+    assert sum(engine.sink_throughput()) > 0
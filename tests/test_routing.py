@@ -0,0 +1,65 @@
+import heapq
+import math
+import random
+from network import SensorNode, BaseStation
+from spatial import SpatialHash
+from routing import Router
+
+# Brute-force Dijkstra over all live pairs, the cheapest route cost of every node to any sink
+def brute_costs(nodes, sinks, alive):
+    cost = {i: math.inf for i in alive}
+    for i in alive:
+        node = nodes[i]
+        for sink in sinks:
+            d = math.hypot(node.x - sink.x, node.y - sink.y)
+            if d <= node.comm_range:
+                cost[i] = min(cost[i], node.energy_per_transmit * d / node.comm_range)
+    heap = [(c, i) for i, c in cost.items() if c < math.inf]
+    heapq.heapify(heap)
+    done = set()
+    while heap:
+        c, i = heapq.heappop(heap)
+        if i in done:
+            continue
+        done.add(i)
+        for j in alive - done:
+            node = nodes[j]
+            d = math.hypot(node.x - nodes[i].x, node.y - nodes[i].y)
+            if d <= node.comm_range and c + node.energy_per_transmit * d / node.comm_range < cost[j]:
+                cost[j] = c + node.energy_per_transmit * d / node.comm_range
+                heapq.heappush(heap, (cost[j], j))
+    return cost
+
+def network(trial, count=120):
+    rng = random.Random(trial)
+    nodes = [SensorNode(i, rng.uniform(0, 300), rng.uniform(0, 300), 'ph',
+                        comm_range=rng.choice([40, 50, 60]) if trial % 2 else 50) for i in range(count)]
+    sinks = [BaseStation(150, 150)] if trial % 3 else [BaseStation(50, 50), BaseStation(250, 250)]
+    return rng, nodes, sinks
+
+def assert_costs(router, nodes, sinks, alive):
+    expected = brute_costs(nodes, sinks, alive)
+    for i in alive:
+        assert router.cost[i] == expected[i] or abs(router.cost[i] - expected[i]) < 1e-9
+        path = router.route(i)
+        assert (path is None) == (expected[i] == math.inf)
+        if path is not None:
+            assert all(hop in alive for hop in path[:-1])
+
+def test_router_matches_brute_force():
+    for trial in range(6):
+        _, nodes, sinks = network(trial)
+        assert_costs(Router(nodes, sinks, SpatialHash.from_nodes(nodes)), nodes, sinks, set(range(len(nodes))))
+
+def test_incremental_repair_matches_brute_force():
+    for trial in range(6):
+        rng, nodes, sinks = network(trial)
+        router = Router(nodes, sinks, SpatialHash.from_nodes(nodes))
+        alive = set(range(len(nodes)))
+        order = list(alive)
+        rng.shuffle(order)
+        for k, i in enumerate(order[:90]):
+            router.remove(i)
+            alive.discard(i)
+            if k % 10 == 0:
+                assert_costs(router, nodes, sinks, alive)
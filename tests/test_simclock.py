@@ -0,0 +1,26 @@
+import random
+from datetime import datetime, timedelta, timezone
+from simclock import SimClock
+
+def test_format_matches_strftime():
+    rng = random.Random(5)
+    # Day, month, year (and leap day) rollovers, odd tick lengths, an aware epoch
+    cases = [(600, datetime(2025, 6, 21)), (3600, datetime(2024, 12, 31, 18, 30)),
+             (7.3, datetime(2024, 2, 28, 23, 59, 58)), (86400 * 1.5, datetime(1999, 12, 31, 12)),
+             (0.2, datetime(2025, 1, 1, 0, 0, 0, 250000)),
+             (45, datetime(2023, 3, 31, 23, 0, tzinfo=timezone(timedelta(hours=2))))]
+    for tick_seconds, epoch in cases:
+        clock = SimClock(tick_seconds, epoch, cache_size=64)
+        span = int(10**9 / tick_seconds)  # About 30 years either way
+        ticks = list(range(-50, 3000)) + [rng.randrange(-span, span) for _ in range(2000)]
+        for tick in ticks:
+            expected = (epoch + timedelta(seconds=tick * tick_seconds)).strftime("%Y-%m-%d %H:%M:%S")
+            assert clock.format(tick) == expected, (tick_seconds, epoch, tick)
+        # Cached strings too
+        assert [clock.format(t) for t in ticks[:100]] == [clock.time_of(t).strftime(clock.fmt) for t in ticks[:100]]
+
+def test_custom_format_and_ticks():
+    clock = SimClock(600, datetime(2025, 6, 21), fmt="%d/%m %H:%M")
+    assert clock.format(6 * 24 * 10 + 3) == "01/07 00:30"
+    assert clock.tick_of(clock.time_of(1234)) == 1234
+    assert clock.day_of_year(0) == datetime(2025, 6, 21).timetuple().tm_yday
@@ -0,0 +1,39 @@
+import numpy as np
+from engine import build_engine
+from streams import CounterRNG, philox, philox_scalar
+
+# Philox4x32-10 known-answer vectors from the Random123 distribution: (counter, key, output)
+KNOWN_ANSWERS = [
+    ((0, 0, 0, 0), (0, 0), (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)),
+    ((0xffffffff,) * 4, (0xffffffff,) * 2, (0x408f276d, 0x41c83b0e, 0xa20bc7c6, 0x6d5451fd)),
+    ((0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344), (0xa4093822, 0x299f31d0),
+     (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1)),
+]
+
+def fingerprint(engine):
+    engine.sync_nodes()
+    return ([(node.battery, node.active, node.duty_cycle) for node in engine.nodes], engine.deaths,
+            engine.sink_throughput(), [row['data'] for row in engine.base_stations[0].collected_data])
+
+def test_philox_known_answers():
+    for counter, key, expected in KNOWN_ANSWERS:
+        assert philox_scalar(*counter, *key) == expected
+        assert tuple(int(w) for w in philox(*counter, *key)) == expected
+
+def test_bulk_and_single_draws_agree():
+    rng = CounterRNG(seed=7)
+    ids = np.arange(50)
+    bulk = rng.uniforms('sense', 12, ids, draw=1)
+    assert bulk.tolist() == [rng.uniform_at('sense', 12, i, draw=1) for i in range(50)]
+
+def test_backends_bit_identical_with_streams():
+    for options in (dict(), dict(lpwan=True), dict(lpwan=True, wake_queue=True), dict(lpwan=True, policy='frugal'),
+                    dict(lpwan=True, weather=True), dict(lpwan=True, mac='aloha'), dict(lpwan=True, mac='csma')):
+        results = []
+        for backend in ('objects', 'array'):
+            engine = build_engine(80, (200, 200), 'random', seed=3, backend=backend, streams=True,
+                                  node_attrs={'energy_per_sense': 0.5}, **options)
+            engine.run(800)
+            results.append(fingerprint(engine))
+        assert results[0] == results[1], options
+        assert results[0][1], options  # Deaths happened, so the death paths are compared too
@@ -0,0 +1,36 @@
+import csv
+import json
+from sweep import CONFIG_PREFIX, METRICS, main, run_sweep
+
+def read_table(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+def test_resume_with_new_axis_keeps_columns_aligned(tmp_path):
+    output = str(tmp_path / 'sweep.csv')
+    first = [{'num_nodes': 5, 'seed': s, 'cycles': 20} for s in (1, 2)]
+    run_sweep(first, output, workers=1)
+    # Resuming with an extra configuration key must widen the table, not append ragged rows
+    second = first + [{'num_nodes': 5, 'seed': 3, 'cycles': 20, 'comm_range': 40}]
+    rows = run_sweep(second, output, workers=1)
+    table = read_table(output)
+    header = table[0]
+    assert len(header) == len(set(header))
+    assert all(len(line) == len(header) for line in table)
+    assert CONFIG_PREFIX + 'comm_range' in header and CONFIG_PREFIX + 'cycles' in header
+    assert header[-len(METRICS) - 1:] == METRICS + ['config']
+    written = [dict(zip(header, line)) for line in table[1:]]
+    assert [row['config'] for row in written] == [row['config'] for row in rows]
+    assert [row[CONFIG_PREFIX + 'comm_range'] for row in written] == ['', '', '40']
+    assert [json.loads(row['config'])['seed'] for row in written] == [1, 2, 3]
+
+def test_cli_later_sources_override(tmp_path, capsys):
+    configs = tmp_path / 'configs.jsonl'
+    configs.write_text('{"num_nodes": 5, "cycles": 10, "seed": 9}\n')
+    output = str(tmp_path / 'sweep.csv')
+    assert main(['--configs', str(configs), '--set', 'cycles=5', '--grid', 'seed=1,2',
+                 '--output', output, '--workers', '1']) == 0
+    written = [dict(zip(read_table(output)[0], line)) for line in read_table(output)[1:]]
+    assert [row[CONFIG_PREFIX + 'cycles'] for row in written] == ['10', '10']
+    assert [row[CONFIG_PREFIX + 'seed'] for row in written] == ['1', '2']
+    assert CONFIG_PREFIX + 'seed' in capsys.readouterr().out
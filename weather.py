@@ -0,0 +1,145 @@
+import math
+import numpy as np
+from network import DATA_TYPES
+
+MINUTES_PER_DAY = 1440
+TYPE_CODES = {data_type: code for code, data_type in enumerate(DATA_TYPES)}
+
+# Diurnal/seasonal time-series model. Readings for every node over a whole block of
+# cycles are generated as (cycles, nodes) arrays, so the hot loop is a table lookup.
+# Node ids index the per-node columns, so they must run 0..len(codes)-1.
+class WeatherModel:
+    def __init__(self, codes, minutes_per_cycle=10, start_day=172, start_hour=0.0, seed=None,
+                 block_length=None, mean_temperature=22.0, seasonal_amplitude=8.0, diurnal_amplitude=6.0,
+                 rain_per_day=0.3, rain_amount=15.0):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        n = len(self.codes)
+        self.minutes_per_cycle = minutes_per_cycle
+        self.start_day = start_day
+        self.start_hour = start_hour
+        self.mean_temperature = mean_temperature
+        self.seasonal_amplitude = seasonal_amplitude
+        self.diurnal_amplitude = diurnal_amplitude
+        self.rain_per_day = rain_per_day
+        self.rain_amount = rain_amount
+        # Keep a block at or under ~16M readings unless told otherwise
+        self.block_length = block_length or max(1, min(1024, (1 << 24) // max(n, 1)))
+        self.rng = np.random.default_rng(seed)
+        rng = self.rng
+        # Per-node microclimate and soil parameters
+        self.temperature_offset = rng.normal(0.0, 1.0, n)
+        self.humidity_offset = rng.normal(0.0, 3.0, n)
+        self.drydown = rng.uniform(0.5, 1.5, n) / (3 * MINUTES_PER_DAY)  # ~3 day e-folding per minute
+        self.infiltration = rng.uniform(0.7, 1.0, n)
+        self.ph_base = rng.uniform(5.8, 7.2, n)
+        self.wilting_point = 15.0
+        self.field_capacity = 80.0
+        # State carried from one block to the next
+        self.moisture = rng.uniform(40.0, 60.0, n)
+        self.anomaly = 0.0
+        self.air = None  # Farm-wide air temperature and rain per cycle of the current block
+        self.rain = None
+        self.cycle = 0
+        self.table = None
+        self.table_start = 1
+
+    def precompute(self, cycles):
+        # Generate the whole run up front as one table
+        self.block_length = max(self.block_length, cycles)
+        self.table = None
+        self.update(1)
+
+    def update(self, cycle):
+        self.cycle = cycle
+        # Blocks carry moisture and weather state forward, so they are generated in order
+        while self.table is None or cycle >= self.table_start + len(self.table):
+            start = 1 if self.table is None else self.table_start + len(self.table)
+            self.table = self.block(start, self.block_length)
+            self.table_start = start
+
+    def sample(self, ids, codes, x, y):
+        return self.table[self.cycle - self.table_start, ids].astype(np.float64)
+
+    def value_at(self, node_id, data_type, x, y):
+        return float(self.table[self.cycle - self.table_start, node_id])
+
+    def block(self, start, length):
+        # (length, nodes) float32 table of each node's own reading for cycles start..start+length-1
+        minutes = (start - 1 + np.arange(length)) * float(self.minutes_per_cycle)
+        hours = (self.start_hour + minutes / 60.0) % 24.0
+        days = self.start_day + (self.start_hour * 60.0 + minutes) / MINUTES_PER_DAY
+        out = np.empty((length, len(self.codes)), dtype=np.float32)
+        rng = self.rng
+
+        # Farm-wide weather anomaly: AR(1) with a half-day memory
+        rho = math.exp(-self.minutes_per_cycle / (12 * 60))
+        shocks = rng.normal(0.0, math.sqrt(1 - rho * rho), length)
+        anomaly = np.empty(length)
+        a = self.anomaly
+        for t in range(length):
+            a = rho * a + shocks[t]
+            anomaly[t] = a
+        self.anomaly = a
+
+        # Seasonal mean peaks mid-July, the diurnal cycle at 15:00
+        seasonal = self.mean_temperature + self.seasonal_amplitude * np.cos(2 * math.pi * (days - 200) / 365)
+        diurnal = self.diurnal_amplitude * np.cos(2 * math.pi * (hours - 15) / 24)
+        air = seasonal + diurnal + 1.5 * anomaly
+        # Farm-wide rain events (amount per cycle, mostly zero)
+        p_rain = min(1.0, self.rain_per_day * self.minutes_per_cycle / MINUTES_PER_DAY)
+        rain_steps = np.flatnonzero(rng.random(length) < p_rain)
+        rain = np.zeros(length)
+        rain[rain_steps] = rng.exponential(self.rain_amount, len(rain_steps))
+        self.air = air
+        self.rain = rain
+
+        cols = np.flatnonzero(self.codes == TYPE_CODES['temperature'])
+        if len(cols):
+            out[:, cols] = air[:, None] + self.temperature_offset[cols] + rng.normal(0.0, 0.3, (length, len(cols)))
+
+        cols = np.flatnonzero(self.codes == TYPE_CODES['humidity'])
+        if len(cols):
+            # Relative humidity falls as the air warms through the day
+            rh = 65.0 - 2.5 * (diurnal + 1.5 * anomaly)
+            noise = rng.normal(0.0, 1.0, (length, len(cols)))
+            out[:, cols] = np.clip(rh[:, None] + self.humidity_offset[cols] + noise, 20.0, 100.0)
+
+        cols = np.flatnonzero(self.codes == TYPE_CODES['light'])
+        if len(cols):
+            daylength = 12.0 + 3.0 * np.cos(2 * math.pi * (days - 172) / 365)
+            sunrise = 12.0 - daylength / 2
+            elevation = np.sin(math.pi * (hours - sunrise) / daylength)
+            elevation[(hours < sunrise) | (hours > sunrise + daylength)] = 0.0
+            clouds = 0.8 + 0.2 * np.tanh(anomaly)
+            par = 1000.0 * elevation * clouds
+            noise = rng.normal(0.0, 10.0, (length, len(cols))) * (par[:, None] > 0)
+            out[:, cols] = np.clip(par[:, None] + noise, 0.0, None)
+
+        cols = np.flatnonzero(self.codes == TYPE_CODES['moisture'])
+        if len(cols):
+            out[:, cols] = self._moisture(cols, rain_steps, rain[rain_steps])
+
+        cols = np.flatnonzero(self.codes == TYPE_CODES['ph'])
+        if len(cols):
+            out[:, cols] = self.ph_base[cols] + rng.normal(0.0, 0.05, (length, len(cols)))
+        return out
+
+    def _moisture(self, cols, rain_steps, amounts):
+        # Exponential drydown toward the wilting point, topped up by farm-wide rain events.
+        # Only the (few) rain events are looped over; each dry spell is one outer product.
+        length = len(self.air)
+        w = self.wilting_point
+        k = self.drydown[cols]
+        level = self.moisture[cols]  # Level at the start of the current dry spell
+        result = np.empty((length, len(cols)))
+        bounds = np.concatenate(([0], rain_steps, [length]))
+        for seg in range(len(bounds) - 1):
+            lo, hi = bounds[seg], bounds[seg + 1]
+            if seg > 0:
+                level = np.minimum(self.field_capacity, level + amounts[seg - 1] * self.infiltration[cols])
+            if hi > lo:
+                elapsed = (np.arange(hi - lo) + 1) * float(self.minutes_per_cycle)
+                result[lo:hi] = w + (level - w) * np.exp(-np.outer(elapsed, k))
+                level = result[hi - 1].copy()
+        self.moisture[cols] = level
+        return result